@@ -0,0 +1,129 @@
+import os
+import pygame
+from typing import List, Optional
+from fonts import get_font
+from models import SUITS, VALUES
+
+CARD_WIDTH = 100
+CARD_HEIGHT = 140
+# Faces sit in a 13 x 4 grid, one row per suit in card code order, with the back below
+COLUMNS = len(VALUES)
+BACK = 52
+SLOTS = 53
+
+# Directory that may hold one PNG per card face, named like 'a_spades.png'
+CARD_IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cards')
+# Where the sheet is kept between runs, with a sidecar (path + '.slots') of '1' for each
+# filled slot and '0' for each slot still to draw, so a partly drawn sheet is reused too
+DEFAULT_CACHE_PATH = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+                                  'project-poker', 'card_atlas.png')
+
+SUIT_COLORS = {
+    'Hearts': (255, 0, 0),  # Red
+    'Diamonds': (255, 165, 0),  # Orange
+    'Clubs': (0, 0, 255),  # Blue
+    'Spades': (0, 0, 0),  # Black
+}
+
+def slot_rect(slot: int) -> pygame.Rect:
+    """Area of a card code (or BACK) within the sheet"""
+    return pygame.Rect(slot % COLUMNS * CARD_WIDTH, slot // COLUMNS * CARD_HEIGHT, CARD_WIDTH, CARD_HEIGHT)
+
+class CardAtlas:
+    def __init__(self, image_dir: str = CARD_IMAGE_DIR, cache_path: Optional[str] = DEFAULT_CACHE_PATH):
+        """
+        All card faces and the card back on one sheet converted to the display format;
+        cards are drawn by blitting subsurfaces of it. Faces come from a cached sheet,
+        from PNGs in `image_dir`, or are drawn as placeholders the first time they are used.
+        Needs the display mode to be set.
+        """
+        self.cache_path = cache_path
+        self.dirty = False  # Slots were drawn since the cache was last saved
+        self.sheet = self._load_sheet(image_dir)
+        self.cards: List[pygame.Surface] = [self.sheet.subsurface(slot_rect(slot)) for slot in range(SLOTS)]
+
+    def _load_sheet(self, image_dir: str) -> pygame.Surface:
+        size = (COLUMNS * CARD_WIDTH, (BACK // COLUMNS + 1) * CARD_HEIGHT)
+        paths = [os.path.join(image_dir, f"{VALUES[code % 13].lower()}_{SUITS[code // 13].lower()}.png")
+                 for code in range(52)]
+        found = [os.path.exists(path) for path in paths]
+        # The cached sheet is stale once a face is edited, added or removed after it was saved
+        sources = [path for path, exists in zip(paths, found) if exists]
+        if os.path.isdir(image_dir):
+            sources.append(image_dir)
+        slots_path = self.cache_path + '.slots' if self.cache_path else None
+        if (slots_path and os.path.exists(self.cache_path) and os.path.exists(slots_path) and
+                all(os.path.getmtime(path) <= os.path.getmtime(self.cache_path) for path in sources)):
+            with open(slots_path) as file:
+                slots = file.read().strip()
+            if len(slots) == SLOTS:
+                self.ready = [slot == '1' for slot in slots]
+                return self._converted(pygame.image.load(self.cache_path))
+
+        if any(found):
+            sheet = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        else:
+            sheet = pygame.Surface(size).convert()
+        self.ready = found + [False]
+        self.dirty = any(found)
+        for code, path in enumerate(paths):
+            if found[code]:
+                image = pygame.image.load(path)
+                if image.get_size() != (CARD_WIDTH, CARD_HEIGHT):
+                    image = pygame.transform.smoothscale(image, (CARD_WIDTH, CARD_HEIGHT))
+                sheet.blit(image, slot_rect(code))
+        return sheet
+
+    @staticmethod
+    def _converted(image: pygame.Surface) -> pygame.Surface:
+        """Match the display's pixel format so blits skip per-pixel conversion"""
+        return image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+
+    def face(self, code: int) -> pygame.Surface:
+        if not self.ready[code]:
+            self._generate(code)
+        return self.cards[code]
+
+    def back(self) -> pygame.Surface:
+        if not self.ready[BACK]:
+            self._generate(BACK)
+        return self.cards[BACK]
+
+    def _generate(self, slot: int):
+        """Draw a placeholder into the sheet, saving the sheet once every slot is filled"""
+        surf = self.cards[slot]
+        rect = surf.get_rect()
+        if slot == BACK:
+            surf.fill((0, 0, 100))
+        else:
+            # Placeholder card with suit-specific colors
+            surf.fill((255, 255, 255))
+            text = get_font(72).render(VALUES[slot % 13], True, SUIT_COLORS[SUITS[slot // 13]])
+            surf.blit(text, text.get_rect(center=rect.center))
+        pygame.draw.rect(surf, (0, 0, 0), rect, 2)
+        self.ready[slot] = True
+        self.dirty = True
+        if all(self.ready):
+            self.save()
+
+    def save(self):
+        """
+        Write the sheet and the slots drawn so far to the cache, so later runs
+        load them in one go. Called once the sheet is complete and on quit.
+        """
+        if not self.cache_path or not self.dirty:
+            return
+        slots_path = self.cache_path + '.slots'
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            # Without its sidecar a sheet is ignored, so a crash midway never marks undrawn slots filled
+            if os.path.exists(slots_path):
+                os.remove(slots_path)
+            pygame.image.save(self.sheet, self.cache_path + '.tmp.png')
+            os.replace(self.cache_path + '.tmp.png', self.cache_path)
+            with open(slots_path + '.tmp', 'w') as file:
+                file.write(''.join('1' if ready else '0' for ready in self.ready))
+            os.replace(slots_path + '.tmp', slots_path)
+            self.dirty = False
+        except (OSError, pygame.error):
+            pass  # The cache only saves time; drawing goes on without it
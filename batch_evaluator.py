@@ -0,0 +1,103 @@
+import numpy as np
+from evaluator import FLUSH_TABLE, RANK_TABLE, SUIT_MASK
+
+# Vectorized counterpart of evaluator.evaluate_codes. It returns the same
+# integer strengths, so batch and scalar results can be compared directly.
+#
+# Every card maps to one packed int64 holding its share of three histograms:
+#   bits  0-16  base-5 rank counts for the seven lowest ranks (2..8)
+#   bits 17-30  base-5 rank counts for the six highest ranks (9..A)
+#   bits 31-46  one 4-bit card counter per suit
+# Summing the packed values of a hand's cards builds all three histograms at
+# once, because no field can overflow into the next with seven cards.
+_LOW_RANKS = 7
+_HIGH_SHIFT = 17
+_SUIT_SHIFT = 31
+
+
+def _digit_sums(count: int) -> np.ndarray:
+    """Number of cards in each base-5 rank histogram of `count` ranks"""
+    values = np.arange(5 ** count)
+    total = np.zeros_like(values)
+    for _ in range(count):
+        total += values % 5
+        values //= 5
+    return total
+
+
+def _build_rank_lookup():
+    """Build a minimal perfect hash over the rank histograms of up to 7 cards"""
+    # High-half histograms are numbered by card count, so the ones that still
+    # fit next to a low half holding n cards are exactly the first
+    # fits[7 - n] indices.
+    high_sizes = _digit_sums(13 - _LOW_RANKS)
+    high_valid = np.flatnonzero(high_sizes <= 7)
+    high_order = high_valid[np.argsort(high_sizes[high_valid], kind='stable')]
+    high_index = np.zeros(len(high_sizes), dtype=np.int32)
+    high_index[high_order] = np.arange(len(high_order), dtype=np.int32)
+    fits = np.array([np.count_nonzero(high_sizes <= n) for n in range(8)])
+
+    # Each low half gets a block just large enough for its compatible high halves
+    low_sizes = _digit_sums(_LOW_RANKS)
+    blocks = np.where(low_sizes <= 7, fits[np.clip(7 - low_sizes, 0, 7)], 0)
+    low_base = (np.cumsum(blocks) - blocks).astype(np.int32)
+
+    keys = np.array(list(RANK_TABLE.keys()), dtype=np.int64)
+    strengths = np.array(list(RANK_TABLE.values()), dtype=np.int32)
+    low = np.zeros_like(keys)
+    high = np.zeros_like(keys)
+    for rank in range(13):
+        count = (keys >> (3 * rank)) & 7
+        if rank < _LOW_RANKS:
+            low += count * 5 ** rank
+        else:
+            high += count * 5 ** (rank - _LOW_RANKS)
+    table = np.zeros(int(blocks.sum()), dtype=np.int32)
+    table[low_base[low] + high_index[high]] = strengths
+    return low_base, high_index, table
+
+
+def _build_card_packs() -> np.ndarray:
+    """Packed histogram contribution of every card code"""
+    ranks = np.arange(52) % 13
+    suits = np.arange(52) // 13
+    low = np.where(ranks < _LOW_RANKS, 5 ** np.minimum(ranks, _LOW_RANKS - 1), 0)
+    high = np.where(ranks >= _LOW_RANKS, 5 ** np.maximum(ranks - _LOW_RANKS, 0), 0)
+    return (low.astype(np.int64) | (high.astype(np.int64) << _HIGH_SHIFT)
+            | (np.int64(1) << (_SUIT_SHIFT + 4 * suits).astype(np.int64)))
+
+
+_LOW_BASE, _HIGH_INDEX, _RANK_STRENGTHS = _build_rank_lookup()
+_CARD_PACKS = _build_card_packs()
+_CARD_BITS = np.int64(1) << np.arange(52, dtype=np.int64)
+_FLUSH_STRENGTHS = np.array(FLUSH_TABLE, dtype=np.int32)
+
+
+def evaluate_batch(hole: np.ndarray, board: np.ndarray) -> np.ndarray:
+    """
+    Evaluate N hands at once from card codes
+    hole: int array of shape (N, 2), board: int array of shape (N, k) with k <= 5
+    Returns an int32 array of N strengths ordered exactly like evaluate_codes.
+    """
+    cards = np.concatenate((np.asarray(hole), np.asarray(board)), axis=1).astype(np.intp)
+    packed = _CARD_PACKS[cards[:, 0]]
+    for column in range(1, cards.shape[1]):
+        packed += _CARD_PACKS[cards[:, column]]
+
+    low = packed & ((1 << _HIGH_SHIFT) - 1)
+    high = (packed >> _HIGH_SHIFT) & ((1 << (_SUIT_SHIFT - _HIGH_SHIFT)) - 1)
+    strengths = _RANK_STRENGTHS[_LOW_BASE[low] + _HIGH_INDEX[high]]
+
+    # Adding 3 to every suit counter sets its top bit exactly when it holds
+    # five or more cards; only those hands need the flush table.
+    flush_rows = np.flatnonzero(((packed >> _SUIT_SHIFT) + 0x3333) & 0x8888)
+    if len(flush_rows):
+        flush_cards = cards[flush_rows]
+        mask = _CARD_BITS[flush_cards[:, 0]]
+        for column in range(1, flush_cards.shape[1]):
+            mask |= _CARD_BITS[flush_cards[:, column]]
+        flush = _FLUSH_STRENGTHS[mask & SUIT_MASK]
+        for suit in range(1, 4):
+            np.maximum(flush, _FLUSH_STRENGTHS[(mask >> (13 * suit)) & SUIT_MASK], out=flush)
+        strengths[flush_rows] = flush
+    return strengths
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from deck import Deck
+from engine import TableEngine
+from game_logic import GameLogic, PokerHand
+from models import Card, Player
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+# A benchmark regresses when its throughput falls more than this fraction below the baseline
+DEFAULT_THRESHOLD = 0.15
+PLAYER_COUNTS = range(2, 11)
+
+# A benchmark returns a callable that runs one timed round, and the operations one round performs
+Benchmark = Callable[[bool], Tuple[Callable[[], None], int, str]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def benchmark(name: str):
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def random_cards(rng: random.Random, count: int) -> List[int]:
+    return rng.sample(range(52), count)
+
+@benchmark("evaluate_hand")
+def bench_evaluate_hand(quick: bool):
+    rng = random.Random(1)
+    hands = [[Card.from_code(code) for code in random_cards(rng, 7)] for _ in range(1000)]
+    def run():
+        for cards in hands:
+            PokerHand.evaluate_hand(cards[:2], cards[2:])
+    return run, len(hands), "hands"
+
+@benchmark("evaluate_codes")
+def bench_evaluate_codes(quick: bool):
+    rng = random.Random(1)
+    hands = [random_cards(rng, 7) for _ in range(10_000)]
+    def run():
+        for codes in hands:
+            PokerHand.evaluate_codes(codes)
+    return run, len(hands), "hands"
+
+@benchmark("evaluate_batch")
+def bench_evaluate_batch(quick: bool):
+    size = 100_000 if quick else 1_000_000
+    from equity import draw_without_replacement
+    cards = draw_without_replacement(np.random.default_rng(1), 52, 7, size)
+    hole, board = np.ascontiguousarray(cards[:, :2]), np.ascontiguousarray(cards[:, 2:])
+    return lambda: PokerHand.evaluate_batch(hole, board), size, "hands"
+
+def _make_winner_bench(players: int) -> Benchmark:
+    def setup(quick: bool):
+        rng = random.Random(players)
+        deals = []
+        for _ in range(1000):
+            codes = random_cards(rng, 5 + 2 * players)
+            seats = [{'hand': codes[5 + 2 * i:7 + 2 * i], 'folded': False} for i in range(players)]
+            deals.append((seats, codes[:5]))
+        def run():
+            for seats, board in deals:
+                GameLogic.get_winner(seats, board)
+        return run, len(deals), "showdowns"
+    return setup
+
+def _make_deal_bench(players: int) -> Benchmark:
+    def setup(quick: bool):
+        shuffler = Deck(players)
+        def run():
+            for hand in range(1000):
+                deck = shuffler.shuffle(hand, 2 * players + 5)
+                _, deck = GameLogic.deal_cards(deck, players)
+                GameLogic.deal_community_cards(deck, 5)
+        return run, 1000, "deals"
+    return setup
+
+def _make_hand_bench(players: int) -> Benchmark:
+    def setup(quick: bool):
+        from simulate import random_policy
+        hands = 200 if quick else 1000
+        def run():
+            rng = random.Random(players)
+            seats = [Player(f"Seat {i + 1}", (0, 0)) for i in range(players)]
+            engine = TableEngine(seats, auto_start=False, seed=players)
+            for _ in range(hands):
+                for player in seats:
+                    if player.chips < engine.big_blind:
+                        player.chips = 1000
+                engine.start_new_hand()
+                while engine.game_phase != "showdown":
+                    engine.act(random_policy(engine, engine.current_player, rng))
+        return run, hands, "hands"
+    return setup
+
+for _players in PLAYER_COUNTS:
+    benchmark(f"get_winner[{_players}p]")(_make_winner_bench(_players))
+    benchmark(f"shuffle_deal[{_players}p]")(_make_deal_bench(_players))
+    benchmark(f"headless_hand[{_players}p]")(_make_hand_bench(_players))
+
+def _make_draw_bench(full: bool) -> Benchmark:
+    def setup(quick: bool):
+        # Render off-screen so the suite also runs on machines without a display
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        from main import PokerGame
+        game = PokerGame()
+        game.draw()
+        def run():
+            for _ in range(100):
+                if full:
+                    game.renderer.invalidate()
+                game.draw()
+        return run, 100, "frames"
+    return setup
+
+benchmark("draw[full]")(_make_draw_bench(True))
+benchmark("draw[idle]")(_make_draw_bench(False))
+
+def measure(setup: Benchmark, quick: bool, repeats: int) -> Dict[str, float]:
+    """Best throughput over several rounds, after one warm-up round"""
+    run, operations, unit = setup(quick)
+    run()
+    best = min(_timed(run) for _ in range(repeats))
+    return {'ops_per_sec': operations / best, 'seconds_per_op': best / operations, 'unit': unit}
+
+def _timed(run: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Names of the benchmarks whose throughput fell more than `threshold` below the baseline"""
+    return [name for name, result in results.items()
+            if name in baseline and result['ops_per_sec'] < baseline[name]['ops_per_sec'] * (1 - threshold)]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the evaluator, engine and renderer")
+    parser.add_argument('--only', help="regular expression selecting benchmarks by name")
+    parser.add_argument('--quick', action='store_true', help="smaller batches and fewer hands")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed fractional drop in throughput before a run fails")
+    parser.add_argument('--output', help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            saved = json.load(file)
+        if saved.get('quick') == args.quick:
+            baseline = saved['results']
+        elif not args.save:
+            print("Baseline was recorded at different sizes (--quick); not comparing")
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.only and not re.search(args.only, name):
+            continue
+        result = results[name] = measure(setup, args.quick, args.repeats)
+        line = f"{name:<24} {result['ops_per_sec']:>14,.0f} {result['unit']}/s"
+        if name in baseline:
+            line += f"  ({result['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1:+.1%} vs baseline)"
+        print(line, flush=True)
+
+    report = {'python': sys.version.split()[0], 'quick': args.quick, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.save:
+        # Benchmarks left out by --only keep their saved baselines
+        report['results'] = {**baseline, **results}
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from engine import Event, TableEngine, BLIND, BOARD, CALL, CHECK, FOLD, HAND_END, HAND_START, RAISE, WIN
+
+# A store is a directory holding one raw little-endian file per column, named
+# <table>.<column>, plus players.json listing the player names that the player
+# columns index into. Rows are only ever appended, so a store can be memory-mapped
+# while it is read and columns of the same table always line up row for row.
+#   actions: one row per blind, fold, check, call or raise
+#   seats:   one row per player dealt into a hand, written when the hand ends
+TABLES: Dict[str, List[Tuple[str, str]]] = {
+    'actions': [('hand', '<u8'), ('player', '<u4'), ('street', 'u1'), ('kind', 'u1'), ('amount', '<u4')],
+    'seats': [('hand', '<u8'), ('player', '<u4'), ('flags', 'u1'), ('net', '<i8')],
+}
+# Writer buffers are stdlib arrays, which append far faster than numpy scalars;
+# these typecodes match the numpy dtypes above on little-endian machines
+_TYPECODES = {'<u8': 'Q', '<u4': 'I', 'u1': 'B', '<i8': 'q'}
+
+# Action kinds in the order of their codes in the kind column
+ACTION_KINDS = [BLIND, FOLD, CHECK, CALL, RAISE]
+_ACTION_CODES = {kind: code for code, kind in enumerate(ACTION_KINDS)}
+CALL_CODE = _ACTION_CODES[CALL]
+CHECK_CODE = _ACTION_CODES[CHECK]
+RAISE_CODE = _ACTION_CODES[RAISE]
+
+# Bits of the seats flags column
+VPIP = 1  # Put chips in voluntarily before the flop
+PFR = 2  # Raised before the flop
+SHOWDOWN = 4  # Still in the hand when it went to showdown
+WON_SHOWDOWN = 8  # Won chips at showdown
+WON = 16  # Won chips at all
+FLAGS = {'vpip': VPIP, 'pfr': PFR, 'showdown': SHOWDOWN, 'won_showdown': WON_SHOWDOWN, 'won': WON}
+
+# Rows buffered per table before they are appended to the column files
+CHUNK_ROWS = 1 << 16
+# Rows read from each column at a time while aggregating
+AGGREGATE_ROWS = 1 << 22
+
+def _column_path(path: str, table: str, column: str) -> str:
+    return os.path.join(path, f"{table}.{column}")
+
+def _row_count(path: str, table: str) -> int:
+    """Complete rows of a table: a crash mid-flush can leave some columns ahead of others"""
+    counts = []
+    for column, dtype in TABLES[table]:
+        file = _column_path(path, table, column)
+        counts.append(os.path.getsize(file) // np.dtype(dtype).itemsize if os.path.exists(file) else 0)
+    return min(counts)
+
+class ColumnWriter:
+    def __init__(self, path: str, chunk_rows: int = CHUNK_ROWS):
+        """
+        Append rows to the store at `path`, creating it if needed. Rows are
+        buffered per column and written out every `chunk_rows` rows, so memory
+        stays bounded however many hands are recorded.
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+        os.makedirs(path, exist_ok=True)
+        players_path = os.path.join(path, 'players.json')
+        self.players: List[str] = []
+        if os.path.exists(players_path):
+            with open(players_path) as file:
+                self.players = json.load(file)
+        self._player_ids = {name: i for i, name in enumerate(self.players)}
+
+        self._files = {}
+        self._buffers: Dict[str, Dict[str, array]] = {}
+        for table, columns in TABLES.items():
+            rows = _row_count(path, table)
+            for column, dtype in columns:
+                file = open(_column_path(path, table, column), 'ab')
+                # Drop any partial rows left by an interrupted flush
+                file.truncate(rows * np.dtype(dtype).itemsize)
+                self._files[table, column] = file
+            self._buffers[table] = {column: array(_TYPECODES[dtype]) for column, dtype in columns}
+        # Hand numbers carry on from the last hand already in the store
+        self.hands = 0
+        rows = _row_count(path, 'seats')
+        if rows:
+            self.hands = int(np.memmap(_column_path(path, 'seats', 'hand'), '<u8', 'r')[rows - 1]) + 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def player_id(self, name: str) -> int:
+        player = self._player_ids.get(name)
+        if player is None:
+            player = self._player_ids[name] = len(self.players)
+            self.players.append(name)
+        return player
+
+    def new_hand(self) -> int:
+        """Number the next hand in the store"""
+        self.hands += 1
+        return self.hands - 1
+
+    def add_action(self, hand: int, player: int, street: int, kind: int, amount: int):
+        columns = self._buffers['actions']
+        columns['hand'].append(hand)
+        columns['player'].append(player)
+        columns['street'].append(street)
+        columns['kind'].append(kind)
+        columns['amount'].append(amount)
+        if len(columns['hand']) >= self.chunk_rows:
+            self._flush_table('actions')
+
+    def add_seat(self, hand: int, player: int, flags: int, net: int):
+        columns = self._buffers['seats']
+        columns['hand'].append(hand)
+        columns['player'].append(player)
+        columns['flags'].append(flags)
+        columns['net'].append(net)
+        if len(columns['hand']) >= self.chunk_rows:
+            self._flush_table('seats')
+
+    def _flush_table(self, table: str):
+        for column, values in self._buffers[table].items():
+            values.tofile(self._files[table, column])
+            del values[:]
+
+    def flush(self):
+        """Write out every buffered row and the player names"""
+        for table in TABLES:
+            self._flush_table(table)
+            for column, _ in TABLES[table]:
+                self._files[table, column].flush()
+        # Replace the names in one step so a crash never leaves the file half written
+        players_path = os.path.join(self.path, 'players.json')
+        with open(players_path + '.tmp', 'w') as file:
+            json.dump(self.players, file)
+        os.replace(players_path + '.tmp', players_path)
+
+    def close(self):
+        if not self._files:
+            return
+        self.flush()
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+class ColumnRecorder:
+    def __init__(self, engine: TableEngine, writer: ColumnWriter, names: Optional[Sequence[str]] = None):
+        """
+        Listen to `engine` and append its actions and showdown results to
+        `writer`. Seats are recorded under `names` (their player names by
+        default), so several seats or tables can share one row in the stats.
+        """
+        self.engine = engine
+        self.writer = writer
+        self.names = names
+        self._hand = 0
+        self._street = 0
+        self._players: List[int] = []  # Player id per seat
+        self._chips: List[int] = []
+        self._flags: List[int] = []
+        self._winnings: List[int] = []
+        engine.add_listener(self.on_event)
+
+    def on_event(self, event: Event):
+        kind = event.kind
+        code = _ACTION_CODES.get(kind)
+        if code is not None:
+            seat = event.seat
+            self.writer.add_action(self._hand, self._players[seat], self._street, code, event.amount)
+            if self._street == 0 and (kind == RAISE or kind == CALL and event.amount):
+                self._flags[seat] |= (VPIP | PFR) if kind == RAISE else VPIP
+        elif kind == BOARD:
+            # The flop, turn and river are streets 1 to 3
+            self._street += 1
+        elif kind == WIN:
+            self._winnings[event.seat] += event.amount
+        elif kind == HAND_START:
+            players = self.engine.players
+            names = self.names if self.names is not None else [player.name for player in players]
+            self._hand = self.writer.new_hand()
+            self._street = 0
+            self._players = [self.writer.player_id(name) for name in names]
+            self._chips = [player.chips for player in players]
+            self._flags = [0] * len(players)
+            self._winnings = [0] * len(players)
+        elif kind == HAND_END:
+            self._finish()
+
+    def _finish(self):
+        players = self.engine.players
+        showdown = self.engine.active_count > 1
+        for seat, player in enumerate(players):
+            if self._chips[seat] <= 0:
+                continue  # Sat the hand out
+            flags = self._flags[seat]
+            if showdown and not player.folded:
+                flags |= SHOWDOWN
+                if self._winnings[seat]:
+                    flags |= WON_SHOWDOWN
+            if self._winnings[seat]:
+                flags |= WON
+            self.writer.add_seat(self._hand, self._players[seat], flags, player.chips - self._chips[seat])
+
+class ColumnStore:
+    def __init__(self, path: str):
+        """Read-only view of a store: every column is memory-mapped, so nothing is loaded up front"""
+        self.path = path
+        with open(os.path.join(path, 'players.json')) as file:
+            self.players: List[str] = json.load(file)
+        self.tables: Dict[str, Dict[str, np.ndarray]] = {}
+        for table, columns in TABLES.items():
+            rows = _row_count(path, table)
+            self.tables[table] = {
+                column: np.memmap(_column_path(path, table, column), dtype, 'r', shape=(rows,))
+                if rows else np.empty(0, dtype)
+                for column, dtype in columns}
+
+    @property
+    def actions(self) -> Dict[str, np.ndarray]:
+        return self.tables['actions']
+
+    @property
+    def seats(self) -> Dict[str, np.ndarray]:
+        return self.tables['seats']
+
+    def chunks(self, table: str, columns: Sequence[str], rows: int = AGGREGATE_ROWS) -> Iterator[List[np.ndarray]]:
+        """Yield the given columns of a table `rows` rows at a time"""
+        arrays = [self.tables[table][column] for column in columns]
+        for start in range(0, len(arrays[0]), rows):
+            yield [np.asarray(values[start:start + rows]) for values in arrays]
+
+class PlayerStats:
+    def __init__(self, players: List[str]):
+        """Per-player totals, one entry per name in `players`"""
+        self.players = players
+        count = len(players)
+        self.hands = np.zeros(count, np.int64)
+        self.flags = {name: np.zeros(count, np.int64) for name in FLAGS}
+        self.net = np.zeros(count, np.int64)
+        self.actions = np.zeros((count, len(ACTION_KINDS)), np.int64)  # Counts per action kind
+
+    def _grow(self, count: int):
+        extra = count - len(self.hands)
+        if extra > 0:
+            self.hands = np.pad(self.hands, (0, extra))
+            self.flags = {name: np.pad(totals, (0, extra)) for name, totals in self.flags.items()}
+            self.net = np.pad(self.net, (0, extra))
+            self.actions = np.pad(self.actions, ((0, extra), (0, 0)))
+
+    def add_store(self, store: ColumnStore, rows: int = AGGREGATE_ROWS):
+        """Add a store's totals, matching its players to these by name"""
+        ids = {name: i for i, name in enumerate(self.players)}
+        for name in store.players:
+            if name not in ids:
+                ids[name] = len(self.players)
+                self.players.append(name)
+        self._grow(len(self.players))
+        remap = np.array([ids[name] for name in store.players], np.int64)
+        count = len(self.players)
+        if not len(remap):
+            return
+
+        # Seats: one bincount over (player, flags) pairs counts every flag combination at once
+        bits = np.arange(32)
+        for player, flags, net in store.chunks('seats', ('player', 'flags', 'net'), rows):
+            player = remap[player]
+            combos = np.bincount(player * 32 + (flags & 31), minlength=count * 32).reshape(count, 32)
+            self.hands += combos.sum(axis=1)
+            for name, bit in FLAGS.items():
+                self.flags[name] += combos[:, (bits & bit) != 0].sum(axis=1)
+            # Summed in int64: bincount weights go through float64 and lose chips on long runs
+            np.add.at(self.net, player, net)
+
+        # Actions: a call of nothing is the big blind checking its option
+        kinds = len(ACTION_KINDS)
+        for player, kind, amount in store.chunks('actions', ('player', 'kind', 'amount'), rows):
+            kind = np.where((kind == CALL_CODE) & (amount == 0), CHECK_CODE, kind)
+            self.actions += np.bincount(remap[player] * kinds + kind, minlength=count * kinds).reshape(count, kinds)
+
+    def rate(self, flag: str, of: Optional[str] = None) -> np.ndarray:
+        """Share of hands with `flag`, or of hands with `of` that also had `flag`"""
+        base = self.hands if of is None else self.flags[of]
+        return self.flags[flag] / np.maximum(base, 1)
+
+    @property
+    def vpip(self) -> np.ndarray:
+        return self.rate('vpip')
+
+    @property
+    def pfr(self) -> np.ndarray:
+        return self.rate('pfr')
+
+    @property
+    def aggression(self) -> np.ndarray:
+        """Aggression factor: bets and raises per call, on every street"""
+        return self.actions[:, RAISE_CODE] / np.maximum(self.actions[:, CALL_CODE], 1)
+
+    @property
+    def showdown_win_rate(self) -> np.ndarray:
+        return self.rate('won_showdown', of='showdown')
+
+    def __str__(self):
+        lines = [f"{'player':>12} {'hands':>12} {'VPIP':>7} {'PFR':>7} {'AF':>6} {'WTSD':>7} {'W$SD':>7} {'chips/hand':>10}"]
+        showdowns = self.rate('showdown')
+        for i, name in enumerate(self.players):
+            lines.append(f"{name:>12} {self.hands[i]:>12} {self.vpip[i]:>7.1%} {self.pfr[i]:>7.1%} "
+                         f"{self.aggression[i]:>6.2f} {showdowns[i]:>7.1%} {self.showdown_win_rate[i]:>7.1%} "
+                         f"{self.net[i] / max(self.hands[i], 1):>+10.2f}")
+        return "\n".join(lines)
+
+def player_stats(paths: Sequence[str], rows: int = AGGREGATE_ROWS) -> PlayerStats:
+    """Aggregate per-player stats over one or more stores"""
+    stats = PlayerStats([])
+    for path in paths:
+        stats.add_store(ColumnStore(path), rows)
+    return stats
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Per-player stats from columnar hand stores")
+    parser.add_argument('stores', nargs='+', help="store directories, such as those written by simulate.py --columns")
+    args = parser.parse_args()
+    print(player_stats(args.stores))
@@ -0,0 +1,63 @@
+from typing import List, Tuple, Union
+import numpy as np
+from models import Card, VALUES, to_codes
+
+# The 1326 two-card starting hands, each as an ascending pair of card codes
+COMBOS: List[Tuple[int, int]] = [(low, high) for high in range(52) for low in range(high)]
+COMBO_INDEX = [[-1] * 52 for _ in range(52)]
+for _index, (_low, _high) in enumerate(COMBOS):
+    COMBO_INDEX[_low][_high] = COMBO_INDEX[_high][_low] = _index
+
+# The 169 canonical starting hands, from AA down: a pair, then the suited
+# and offsuit versions of every lower kicker
+HAND_CLASSES: List[str] = []
+_CLASS_INDEX = {}
+for _high in range(12, -1, -1):
+    for _low in range(_high, -1, -1):
+        for _suited in ((None,) if _high == _low else (True, False)):
+            _CLASS_INDEX[(_high, _low, _suited)] = len(HAND_CLASSES)
+            _name = VALUES[_high].replace('10', 'T') + VALUES[_low].replace('10', 'T')
+            HAND_CLASSES.append(_name if _suited is None else _name + ('s' if _suited else 'o'))
+
+def combo_index(first: Union[Card, int], second: Union[Card, int]) -> int:
+    """Index of a two-card hand in COMBOS"""
+    first, second = to_codes((first, second))
+    return COMBO_INDEX[first][second]
+
+def hand_class(first: Union[Card, int], second: Union[Card, int]) -> int:
+    """Index of a two-card hand's canonical class in HAND_CLASSES"""
+    first, second = to_codes((first, second))
+    high, low = max(first % 13, second % 13), min(first % 13, second % 13)
+    suited = None if high == low else first // 13 == second // 13
+    return _CLASS_INDEX[(high, low, suited)]
+
+COMBO_CLASS = [hand_class(low, high) for low, high in COMBOS]
+# Representative combo of each class: spades for suited hands, spades and hearts otherwise
+CLASS_COMBOS: List[int] = [
+    combo_index(39 + high, 39 + low) if suited else combo_index(39 + high, low)
+    for (high, low, suited), _ in sorted(_CLASS_INDEX.items(), key=lambda item: item[1])
+]
+
+# Card codes and 52-bit masks of every combo as arrays for vectorized work
+COMBO_CARDS = np.array(COMBOS, dtype=np.int64)
+COMBO_MASKS = (np.int64(1) << COMBO_CARDS[:, 0]) | (np.int64(1) << COMBO_CARDS[:, 1])
+
+def suit_permutation(combo: int, target: int) -> List[int]:
+    """
+    Card permutation that relabels suits so `combo` becomes `target`.
+    Both combos must belong to the same hand class.
+    """
+    mapping = {}
+    source_cards = sorted(COMBOS[combo], key=lambda code: code % 13)
+    target_cards = sorted(COMBOS[target], key=lambda code: code % 13)
+    if source_cards[0] % 13 == source_cards[1] % 13:
+        # Pairs can map their two suits in either order; keep the natural one
+        source_cards.sort()
+        target_cards.sort()
+    for source, destination in zip(source_cards, target_cards):
+        mapping.setdefault(source // 13, destination // 13)
+    free = [suit for suit in range(4) if suit not in mapping.values()]
+    for suit in range(4):
+        if suit not in mapping:
+            mapping[suit] = free.pop(0)
+    return [mapping[code // 13] * 13 + code % 13 for code in range(52)]
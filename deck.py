@@ -0,0 +1,55 @@
+from typing import List, Optional
+import numpy as np
+
+ORDERED = list(range(52))
+# Hands whose random draws are generated together
+HANDS_PER_BLOCK = 256
+# Bound for each draw of a Fisher-Yates shuffle: draw i picks one of the 52 - i cards left
+_SPANS = np.arange(52, 0, -1)
+
+
+class Deck:
+    def __init__(self, seed: Optional[int] = None):
+        """
+        A table's deck: one reusable buffer of card codes, shuffled from the table's
+        own Philox stream. Philox is counter-based, so the draws of hand n are found
+        by setting the counter rather than by replaying hands 0..n-1, and a hand is
+        exactly reproducible from (seed, hand number).
+        """
+        # Seeds are kept to 64 bits so snapshots and hand histories can record them
+        self.seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0]) if seed is None else seed
+        key = np.random.SeedSequence(self.seed).generate_state(2, np.uint64)
+        self._bit_generator = np.random.Philox(key=key)
+        self._generator = np.random.Generator(self._bit_generator)
+        self.cards = list(ORDERED)
+        self._block = -1
+        self._picks: List[List[int]] = []
+
+    def _load_block(self, block: int):
+        """Draw the shuffles of hands block * HANDS_PER_BLOCK onwards in one call"""
+        state = self._bit_generator.state
+        state['state']['counter'][:] = (0, block, 0, 0)
+        state['buffer_pos'] = len(state['buffer'])
+        state['has_uint32'] = 0
+        self._bit_generator.state = state
+        uniforms = self._generator.random((HANDS_PER_BLOCK, len(_SPANS)))
+        self._picks = (uniforms * _SPANS).astype(np.int64).tolist()
+        self._block = block
+
+    def shuffle(self, hand_number: int, count: int = 52) -> List[int]:
+        """
+        Shuffle for one hand with a partial Fisher-Yates pass that draws only
+        `count` cards, leaving them in order at the end of the buffer so the hand
+        is dealt by popping. Returns the buffer itself.
+        """
+        block, row = divmod(hand_number, HANDS_PER_BLOCK)
+        if block != self._block:
+            self._load_block(block)
+        picks = self._picks[row]
+        cards = self.cards
+        cards[:] = ORDERED
+        last = 51
+        for pick in picks[:min(count, 51)]:
+            cards[pick], cards[last] = cards[last], cards[pick]
+            last -= 1
+        return cards
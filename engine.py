@@ -0,0 +1,343 @@
+from typing import Callable, List, Optional, Sequence, Tuple
+from deck import Deck
+from evaluator import board_evaluator
+from game_logic import GameLogic
+from models import Player
+from pots import PotManager
+
+# Action kinds a seat can take
+FOLD = "fold"
+CHECK = "check"
+CALL = "call"
+RAISE = "raise"
+
+# Event kinds emitted by the engine, in the order they happen within a hand
+HAND_START = "hand_start"
+HOLE_CARDS = "hole_cards"
+BLIND = "blind"
+BOARD = "board"
+POT = "pot"
+WIN = "win"
+HAND_END = "hand_end"
+GAME_OVER = "game_over"
+
+class Action:
+    def __init__(self, kind: str, amount: int = 0):
+        self.kind = kind
+        self.amount = amount  # Total bet to raise to; ignored for other kinds
+
+    def __repr__(self):
+        return f"Action({self.kind!r}, {self.amount})" if self.kind == RAISE else f"Action({self.kind!r})"
+
+class Event:
+    __slots__ = ('kind', 'seat', 'amount', 'cards')
+
+    def __init__(self, kind: str, seat: int = -1, amount: int = 0, cards: Sequence[int] = ()):
+        self.kind = kind
+        self.seat = seat
+        self.amount = amount  # Chips moved by the event (posted, bet or won)
+        self.cards = cards
+
+    def __repr__(self):
+        return f"Event({self.kind!r}, seat={self.seat}, amount={self.amount}, cards={list(self.cards)})"
+
+class TableEngine:
+    def __init__(self, players: List[Player], small_blind: int = 10, big_blind: int = 20,
+                 auto_start: bool = True, seed: Optional[int] = None, ante: int = 0):
+        self.players = players
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.ante = ante  # Posted by every player before the blinds; reported as BLIND events
+        self.deck: List[int] = []
+        self.board: List[int] = []
+        self.current_player = 0
+        self.pot = 0
+        self.current_bet = 0
+        self.dealer = 0
+        self.blind_seats = (-1, -1)  # Seats that posted the small and big blind this hand
+        self.hand_number = 0
+        self.game_phase = "preflop"  # preflop, flop, turn, river, showdown, game_over
+        # When False, the table rests in the showdown phase until start_new_hand is called
+        self.auto_start = auto_start
+        self.listeners: List[Callable[[Event], None]] = []
+        self.pots = PotManager(len(players))  # Per-seat contributions, split into side pots at showdown
+        self.shuffler = Deck(seed)  # Hand n of a table is dealt the same way for the same seed
+        # Betting round bookkeeping, updated as each action is applied
+        self.active_count = 0  # Players who have not folded
+        self.can_act = 0  # Players who have not folded and are not all-in
+        self.to_act = 0  # Of those, how many still have to act since the round opened or was last raised
+        self.last_aggressor = -1  # Seat that made the last bet or raise this round
+
+    def add_listener(self, listener: Callable[[Event], None]):
+        """Call `listener` with every Event the engine emits"""
+        self.listeners.append(listener)
+
+    def emit(self, kind: str, seat: int = -1, amount: int = 0, cards: Sequence[int] = ()):
+        event = Event(kind, seat, amount, cards)
+        for listener in self.listeners:
+            listener(event)
+
+    def start_new_hand(self, deck: Optional[List[int]] = None):
+        """Start the next hand, dealing from `deck` (cards come off the end) instead of a fresh shuffle"""
+        # Stop once fewer than two players can still cover a blind
+        if sum(1 for p in self.players if p.chips > 0) < 2:
+            self.game_phase = "game_over"
+            if self.listeners:
+                self.emit(GAME_OVER)
+            return
+
+        # Reset game state
+        self.hand_number += 1
+        self.board = []
+        self.pot = 0
+        self.pots.reset(len(self.players))
+        self.current_bet = 0
+        self.game_phase = "preflop"
+
+        # Reset player states; players without chips sit the hand out and the button passes them by
+        for player in self.players:
+            player.hole = []
+            player.bet = 0
+            player.folded = player.chips <= 0
+            player.is_all_in = False
+        if self.players[self.dealer].folded:
+            self.dealer = self.next_seat(self.dealer)
+        if self.listeners:
+            self.emit(HAND_START, self.dealer)
+        self.active_count = self.can_act = sum(1 for p in self.players if not p.folded)
+        self.last_aggressor = -1
+
+        # Shuffle only the cards the hand can use, then deal
+        if deck is not None:
+            self.deck = list(deck)
+        else:
+            self.deck = self.shuffler.shuffle(self.hand_number, 2 * len(self.players) + 5)
+        hands, self.deck = GameLogic.deal_cards(self.deck, len(self.players))
+        for i, player in enumerate(self.players):
+            player.hole = hands[i]
+            if self.listeners:
+                self.emit(HOLE_CARDS, i, cards=player.hole)
+
+        # Post antes, then blinds
+        if self.ante:
+            for seat in range(len(self.players)):
+                self.post_ante(seat, self.ante)
+        sb_pos = self.next_seat(self.dealer)
+        bb_pos = self.next_seat(sb_pos)
+        self.post_blind(sb_pos, self.small_blind)
+        self.post_blind(bb_pos, self.big_blind)
+        self.blind_seats = (sb_pos, bb_pos)
+        # A short blind leaves the bet at what was actually posted
+        self.current_bet = max(self.players[sb_pos].bet, self.players[bb_pos].bet)
+        # Everyone who can still act gets a turn, the big blind included
+        self.to_act = self.can_act
+        self.current_player = bb_pos
+        self.next_player()
+
+    def next_seat(self, seat: int) -> int:
+        """The next seat after `seat` that was dealt into the hand"""
+        seat = (seat + 1) % len(self.players)
+        while self.players[seat].folded:
+            seat = (seat + 1) % len(self.players)
+        return seat
+
+    def post_ante(self, seat: int, amount: int):
+        """Post an ante: dead money in the pot that does not count towards the player's bet"""
+        player = self.players[seat]
+        if player.folded or player.is_all_in:
+            return
+        amount = min(amount, player.chips)
+        player.chips -= amount
+        self.pot += amount
+        self.pots.add(seat, amount)
+        if player.chips == 0:
+            player.is_all_in = True
+            self.can_act -= 1
+        if self.listeners:
+            self.emit(BLIND, seat, amount)
+
+    def post_blind(self, seat: int, amount: int):
+        """Post a blind, putting the player all-in if they cannot cover it"""
+        player = self.players[seat]
+        if player.folded or player.is_all_in:
+            return
+        amount = min(amount, player.chips)
+        player.chips -= amount
+        player.bet += amount
+        self.pot += amount
+        self.pots.add(seat, amount)
+        if player.chips == 0:
+            player.is_all_in = True
+            self.can_act -= 1
+        if self.listeners:
+            self.emit(BLIND, seat, amount)
+
+    def raise_bounds(self) -> Tuple[int, int]:
+        """Smallest and largest total bet the current player may raise to"""
+        player = self.players[self.current_player]
+        # Minimum raise must be at least the size of the previous bet/raise
+        min_raise = max(self.current_bet + (self.current_bet - player.bet), self.current_bet + self.big_blind)
+        max_raise = player.chips + player.bet
+        return min(min_raise, max_raise), max_raise
+
+    def act(self, action: Action):
+        """Apply an action for the current player and advance the hand"""
+        seat = self.current_player
+        current_player = self.players[seat]
+        kind = action.kind
+
+        if kind == FOLD:
+            current_player.folded = True
+            self.active_count -= 1
+            self.can_act -= 1
+            self.to_act -= 1
+            if self.listeners:
+                self.emit(FOLD, seat)
+            self.next_player()
+
+        elif kind == CHECK and self.current_bet == current_player.bet:
+            # Only allow check if no bet has been made in this round
+            self.to_act -= 1
+            if self.listeners:
+                self.emit(CHECK, seat)
+            self.next_player()
+
+        elif kind == RAISE and current_player.chips + current_player.bet > self.current_bet:
+            min_raise, max_raise = self.raise_bounds()
+            raise_amount = max(min_raise, min(action.amount, max_raise))
+            self.current_bet = raise_amount
+            amount = self.put_in(seat, raise_amount - current_player.bet)
+            # Everyone else who can still act has to answer the raise
+            self.to_act = self.can_act if current_player.is_all_in else self.can_act - 1
+            self.last_aggressor = seat
+            if self.listeners:
+                self.emit(RAISE, seat, amount)
+            self.next_player()
+
+        else:
+            # Calls, checks facing a bet and raises that cannot exceed the bet all become calls
+            self.handle_call(current_player)
+
+    def put_in(self, seat: int, amount: int) -> int:
+        """Move up to `amount` chips from a seat into the pot, going all-in if short"""
+        player = self.players[seat]
+        if amount >= player.chips:
+            amount = player.chips
+            player.is_all_in = True
+            self.can_act -= 1
+        player.chips -= amount
+        player.bet += amount
+        self.pot += amount
+        self.pots.add(seat, amount)
+        return amount
+
+    def handle_call(self, player: Player):
+        """Handle a call action for a player"""
+        call_amount = self.current_bet - player.bet
+        amount = self.put_in(self.current_player, call_amount) if call_amount > 0 else 0
+        self.to_act -= 1
+        if self.listeners:
+            self.emit(CALL, self.current_player, amount)
+        self.next_player()
+
+    def get_active_players(self) -> List[Player]:
+        """Get list of players who haven't folded"""
+        return [p for p in self.players if not p.folded]
+
+    def next_player(self):
+        # If only one player remains, go to showdown
+        if self.active_count == 1:
+            self.showdown()
+            return
+
+        # Check if we've completed a round of betting
+        if self.is_betting_round_complete():
+            self.next_phase()
+            return
+
+        # Find the next player who can still act, skipping folded and all-in players
+        players = self.players
+        next_player = (self.current_player + 1) % len(players)
+        while players[next_player].folded or players[next_player].is_all_in:
+            next_player = (next_player + 1) % len(players)
+
+        # A lone player who already covers every bet has no one left to bet against
+        if self.can_act == 1 and players[next_player].bet >= self.current_bet:
+            self.next_phase()
+            return
+
+        self.current_player = next_player
+
+    def is_betting_round_complete(self) -> bool:
+        """
+        The round is over once every player who can still act has done so since
+        the last raise, which leaves them all matching the bet or all-in.
+        """
+        return self.active_count == 1 or self.to_act == 0
+
+    def next_phase(self):
+        if self.game_phase == "preflop":
+            self.game_phase = "flop"
+            self.deal_community_cards(3)
+        elif self.game_phase == "flop":
+            self.game_phase = "turn"
+            self.deal_community_cards(1)
+        elif self.game_phase == "turn":
+            self.game_phase = "river"
+            self.deal_community_cards(1)
+        elif self.game_phase == "river":
+            self.game_phase = "showdown"
+            self.showdown()
+            return
+
+        # Reset betting for new phase
+        self.current_bet = 0
+        for player in self.players:
+            player.bet = 0
+
+        # With fewer than two players left to bet, run the board out
+        if self.can_act < 2:
+            self.next_phase()
+            return
+        self.to_act = self.can_act
+        self.last_aggressor = -1
+
+        # Set current player to first player after dealer who can still act
+        players = self.players
+        seat = (self.dealer + 1) % len(players)
+        while players[seat].folded or players[seat].is_all_in:
+            seat = (seat + 1) % len(players)
+        self.current_player = seat
+
+    def deal_community_cards(self, num_cards: int):
+        codes, self.deck = GameLogic.deal_community_cards(self.deck, num_cards)
+        self.board.extend(codes)
+        if self.listeners:
+            self.emit(BOARD, cards=codes)
+
+    def showdown(self):
+        self.game_phase = "showdown"
+
+        # Evaluate each remaining hand once, then award the main pot and every side pot
+        folded = [player.folded for player in self.players]
+        contenders = [seat for seat, player in enumerate(self.players) if not player.folded]
+        if len(contenders) == 1:
+            strengths = {contenders[0]: 0}
+        else:
+            board = board_evaluator(tuple(self.board))
+            strengths = {seat: board.evaluate(*self.players[seat].hole) for seat in contenders}
+        for pot, shares in self.pots.award(strengths, folded, self.dealer):
+            if self.listeners:
+                self.emit(POT, amount=pot.amount)
+            for seat, amount in shares:
+                self.players[seat].chips += amount
+                if self.listeners:
+                    self.emit(WIN, seat, amount)
+        self.pot = 0
+        if self.listeners:
+            self.emit(HAND_END)
+
+        # Start new hand
+        self.dealer = (self.dealer + 1) % len(self.players)
+        if self.auto_start:
+            self.start_new_hand()
@@ -0,0 +1,224 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np
+from models import Card, to_codes
+from game_logic import PokerHand
+from evaluator import RANK_KEY, evaluate_state
+
+# Trials simulated per vectorized step inside a worker; bounds worker memory
+CHUNK_TRIALS = 65536
+# z-score used for the reported confidence intervals (95%)
+CONFIDENCE_Z = 1.96
+
+class EquityResult:
+    def __init__(self, totals: np.ndarray, trials: int, exact: bool = False):
+        """
+        totals: per-player sums of shape (4, players) holding outright wins,
+        ties, pot shares and squared pot shares over all run-outs
+        """
+        self.trials = trials
+        self.exact = exact
+        self.win = (totals[0] / trials).tolist()
+        self.tie = (totals[1] / trials).tolist()
+        self.equity = (totals[2] / trials).tolist()
+        if exact:
+            self.std_error = [0.0] * len(self.equity)
+        else:
+            variance = np.maximum(totals[3] / trials - (totals[2] / trials) ** 2, 0.0)
+            self.std_error = np.sqrt(variance / trials).tolist()
+        self.confidence = [(max(0.0, e - CONFIDENCE_Z * s), min(1.0, e + CONFIDENCE_Z * s))
+                           for e, s in zip(self.equity, self.std_error)]
+
+    def __str__(self):
+        return ", ".join(f"P{i+1}: {e:.2%} ±{CONFIDENCE_Z * s:.2%}"
+                         for i, (e, s) in enumerate(zip(self.equity, self.std_error)))
+
+def draw_without_replacement(rng: np.random.Generator, population: int, count: int, size: int) -> np.ndarray:
+    """Draw `count` distinct indices below `population` for each of `size` rows"""
+    picks = np.empty((size, count), dtype=np.int64)
+    for k in range(count):
+        index = rng.integers(0, population - k, size=size)
+        # Step over the earlier picks in ascending order so every unused index is equally likely
+        for previous in range(k):
+            index += index >= picks[:, previous]
+        picks[:, k] = index
+        picks[:, :k + 1].sort(axis=1)
+    return picks
+
+def _score_boards(holes: np.ndarray, boards: np.ndarray) -> np.ndarray:
+    """Accumulate wins, ties, shares and squared shares for every player over the given boards"""
+    strengths = np.empty((len(holes), len(boards)), dtype=np.int32)
+    for player, hole in enumerate(holes):
+        strengths[player] = PokerHand.evaluate_batch(np.broadcast_to(hole, (len(boards), 2)), boards)
+    best = strengths == strengths.max(axis=0)
+    winners = best.sum(axis=0)
+    share = best / winners
+    return np.stack((
+        (best & (winners == 1)).sum(axis=1),
+        (best & (winners > 1)).sum(axis=1),
+        share.sum(axis=1),
+        (share * share).sum(axis=1),
+    )).astype(np.float64)
+
+def _simulate(holes: np.ndarray, board: np.ndarray, trials: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Run `trials` random run-outs on one RNG stream (executed inside a worker process)"""
+    rng = np.random.default_rng(seed)
+    dead = np.concatenate((holes.ravel(), board))
+    live = np.setdiff1d(np.arange(52), dead)
+    missing = 5 - len(board)
+    totals = np.zeros((4, len(holes)))
+    for start in range(0, trials, CHUNK_TRIALS):
+        size = min(CHUNK_TRIALS, trials - start)
+        run_outs = live[draw_without_replacement(rng, len(live), missing, size)]
+        boards = np.concatenate((np.broadcast_to(board, (size, len(board))), run_outs), axis=1)
+        totals += _score_boards(holes, boards)
+    return totals
+
+def _enumerate(holes: List[List[int]], board: List[int]) -> np.ndarray:
+    """Score every remaining turn and river for all players and sum the results"""
+    players = len(holes)
+    wins = [0] * players
+    ties = [0] * players
+    shares = [0.0] * players
+    squares = [0.0] * players
+
+    def score(strengths: List[int]):
+        best = max(strengths)
+        winners = strengths.count(best)
+        share = 1.0 / winners
+        for player, strength in enumerate(strengths):
+            if strength == best:
+                if winners == 1:
+                    wins[player] += 1
+                else:
+                    ties[player] += 1
+                shares[player] += share
+                squares[player] += share * share
+
+    # Rank-histogram key and card mask of each player's hole cards plus the board
+    states = []
+    for hole in holes:
+        key = sum(RANK_KEY[code] for code in hole + board)
+        mask = 0
+        for code in hole + board:
+            mask |= 1 << code
+        states.append((key, mask))
+    dead = set(board).union(*holes)
+    live = [code for code in range(52) if code not in dead]
+
+    missing = 5 - len(board)
+    if missing == 0:
+        score([evaluate_state(key, mask) for key, mask in states])
+    elif missing == 1:
+        for river in live:
+            river_key, river_bit = RANK_KEY[river], 1 << river
+            score([evaluate_state(key + river_key, mask | river_bit) for key, mask in states])
+    else:
+        for i, turn in enumerate(live):
+            # Every river below shares this turn card, so fold it into the states once
+            turn_key, turn_bit = RANK_KEY[turn], 1 << turn
+            turn_states = [(key + turn_key, mask | turn_bit) for key, mask in states]
+            for river in live[i + 1:]:
+                river_key, river_bit = RANK_KEY[river], 1 << river
+                score([evaluate_state(key + river_key, mask | river_bit) for key, mask in turn_states])
+    return np.array([wins, ties, shares, squares], dtype=np.float64)
+
+class EquityCalculator:
+    def __init__(self, workers: Optional[int] = None, seed: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = np.random.SeedSequence(seed)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+    @staticmethod
+    def _parse(hole_cards: Sequence[Sequence[Union[Card, int]]],
+               board: Sequence[Union[Card, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Validate the players and board and convert them to card code arrays"""
+        if not 2 <= len(hole_cards) <= 10:
+            raise ValueError("Equity needs between 2 and 10 players")
+        holes = np.array([to_codes(hole) for hole in hole_cards], dtype=np.int64)
+        codes = np.array(to_codes(board), dtype=np.int64)
+        if holes.shape[1:] != (2,):
+            raise ValueError("Every player needs exactly 2 hole cards")
+        if len(codes) not in (0, 3, 4, 5):
+            raise ValueError("The board must be empty, a flop, a turn or a river")
+        dealt = np.concatenate((holes.ravel(), codes))
+        if len(np.unique(dealt)) != len(dealt):
+            raise ValueError("A card was dealt more than once")
+        return holes, codes
+
+    def calculate(self, hole_cards: Sequence[Sequence[Union[Card, int]]], board: Sequence[Union[Card, int]] = (),
+                  trials: int = 100_000, target_std_error: Optional[float] = None) -> EquityResult:
+        """
+        Estimate each player's equity with Monte Carlo run-outs of the board.
+        Trials are split across worker processes, each on its own seeded RNG stream.
+        With target_std_error, stops early once every player's standard error is below it.
+        """
+        if trials < 1:
+            raise ValueError("Equity needs at least one trial")
+        holes, codes = self._parse(hole_cards, board)
+        totals = np.zeros((4, len(holes)))
+        done = 0
+
+        # Small jobs are not worth the process round trip
+        if self.workers == 1 or trials <= CHUNK_TRIALS:
+            wave_size = trials if target_std_error is None else min(trials, CHUNK_TRIALS)
+            while done < trials:
+                size = min(wave_size, trials - done)
+                totals += _simulate(holes, codes, size, self.seed.spawn(1)[0])
+                done += size
+                if target_std_error is not None and self._converged(totals, done, target_std_error):
+                    break
+            return EquityResult(totals, done)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        # Without a target the whole job is one wave, otherwise check after each wave
+        per_task = -(-trials // self.workers) if target_std_error is None else CHUNK_TRIALS
+        while done < trials:
+            sizes = []
+            while len(sizes) < self.workers and done + sum(sizes) < trials:
+                sizes.append(min(per_task, trials - done - sum(sizes)))
+            futures = [self._executor.submit(_simulate, holes, codes, size, stream)
+                       for size, stream in zip(sizes, self.seed.spawn(len(sizes)))]
+            for future in futures:
+                totals += future.result()
+            done += sum(sizes)
+            if target_std_error is not None and self._converged(totals, done, target_std_error):
+                break
+        return EquityResult(totals, done)
+
+    def calculate_exact(self, hole_cards: Sequence[Sequence[Union[Card, int]]],
+                        board: Sequence[Union[Card, int]]) -> EquityResult:
+        """
+        Compute each player's exact equity by walking every remaining turn and river.
+        Needs at least a flop; preflop boards are left to calculate().
+        """
+        holes, codes = self._parse(hole_cards, board)
+        if len(codes) < 3:
+            raise ValueError("Exact equity needs at least a flop")
+        live = 52 - holes.size - len(codes)
+        run_outs = math.comb(live, 5 - len(codes))
+        totals = _enumerate(holes.tolist(), codes.tolist())
+        return EquityResult(totals, run_outs, exact=True)
+
+    @staticmethod
+    def _converged(totals: np.ndarray, trials: int, target_std_error: float) -> bool:
+        """Check whether every player's standard error is below the target"""
+        mean = totals[2] / trials
+        variance = np.maximum(totals[3] / trials - mean * mean, 0.0)
+        return bool(np.all(np.sqrt(variance / trials) <= target_std_error))
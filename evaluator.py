@@ -0,0 +1,205 @@
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+# Hand strengths are single integers: the hand rank (0 high card .. 9 royal
+# flush) in bits 20-23 followed by up to five 4-bit kicker values (2..14),
+# so comparing two strengths compares the hands.
+HAND_RANK_SHIFT = 20
+KICKER_COUNTS = (5, 4, 3, 3, 1, 5, 2, 2, 1, 0)
+
+# A card code is suit_index * 13 + rank_index, with ranks ordered 2..A
+SUIT_MASK = 0x1FFF
+RANK_KEY = [1 << (3 * (code % 13)) for code in range(52)]
+
+
+def make_strength(hand_rank: int, kickers: List[int]) -> int:
+    """Pack a hand rank and its kickers into a comparable integer"""
+    strength = hand_rank
+    for value in kickers:
+        strength = (strength << 4) | value
+    return strength << (4 * (5 - len(kickers)))
+
+
+def decode_strength(strength: int) -> Tuple[int, List[int]]:
+    """Unpack a strength back into the (hand_rank, kickers) form"""
+    hand_rank = strength >> HAND_RANK_SHIFT
+    kickers = []
+    for shift in (16, 12, 8, 4, 0):
+        value = (strength >> shift) & 0xF
+        if value:
+            kickers.append(value)
+    return hand_rank, kickers[:KICKER_COUNTS[hand_rank]]
+
+
+def _straight_high(rank_bits: int) -> int:
+    """Return the top card value of the best straight in a rank bitmask, or 0"""
+    # Treat the ace as low as well so the wheel (A-2-3-4-5) is found
+    bits = (rank_bits << 1) | (rank_bits >> 12)
+    for top in range(13, 3, -1):
+        run = 0x1F << (top - 4)
+        if bits & run == run:
+            return top + 1
+    return 0
+
+
+def _flush_strength(rank_bits: int) -> int:
+    """Best hand from five or more cards of a single suit"""
+    high = _straight_high(rank_bits)
+    if high == 14:
+        return make_strength(9, [])
+    if high:
+        return make_strength(8, [high])
+    values = [r + 2 for r in range(12, -1, -1) if rank_bits >> r & 1]
+    return make_strength(5, values[:5])
+
+
+def _rank_strength(present: List[int], quads: List[int], trips: List[int],
+                   pairs: List[int], rank_bits: int) -> int:
+    """Best hand from a multiset of ranks when no flush is possible"""
+    # Every list holds card values in descending order
+    if quads:
+        kickers = [v for v in present if v != quads[0]]
+        return make_strength(7, [quads[0]] + kickers[:1])
+
+    if trips:
+        # A second set of trips can fill the pair half of a full house
+        if len(trips) > 1 and (not pairs or trips[1] > pairs[0]):
+            return make_strength(6, [trips[0], trips[1]])
+        if pairs:
+            return make_strength(6, [trips[0], pairs[0]])
+
+    high = STRAIGHT_HIGH[rank_bits]
+    if high:
+        return make_strength(4, [high])
+
+    if trips:
+        kickers = [v for v in present if v != trips[0]]
+        return make_strength(3, [trips[0]] + kickers[:2])
+
+    if len(pairs) >= 2:
+        kickers = [v for v in present if v != pairs[0] and v != pairs[1]]
+        return make_strength(2, pairs[:2] + kickers[:1])
+
+    if pairs:
+        kickers = [v for v in present if v != pairs[0]]
+        return make_strength(1, [pairs[0]] + kickers[:3])
+
+    return make_strength(0, present[:5])
+
+
+def _build_rank_table() -> dict:
+    """Map every rank histogram of up to 7 cards to its best hand"""
+    table = {}
+    groups = ([], [], [], [], [])
+
+    # Walk ranks from ace down so the grouped values come out sorted
+    def fill(rank: int, remaining: int, key: int, rank_bits: int, present: List[int]):
+        if rank < 0:
+            table[key] = _rank_strength(present, groups[4], groups[3], groups[2], rank_bits)
+            return
+        fill(rank - 1, remaining, key, rank_bits, present)
+        value = rank + 2
+        for count in range(1, min(4, remaining) + 1):
+            if count > 1:
+                groups[count].append(value)
+            fill(rank - 1, remaining - count, key + (count << (3 * rank)),
+                 rank_bits | (1 << rank), present + [value])
+            if count > 1:
+                groups[count].pop()
+
+    fill(12, 7, 0, 0, [])
+    return table
+
+
+def _build_flush_table() -> List[int]:
+    """Best flush or straight flush for every 13-bit suit mask (0 if no flush)"""
+    return [_flush_strength(bits) if bin(bits).count('1') >= 5 else 0
+            for bits in range(1 << 13)]
+
+
+def _build_spread_table() -> List[int]:
+    """Spread each bit of a 13-bit suit mask into its 3-bit rank counter"""
+    table = [0] * (1 << 13)
+    for bits in range(1, 1 << 13):
+        low = bits & -bits
+        table[bits] = table[bits ^ low] + (1 << (3 * (low.bit_length() - 1)))
+    return table
+
+
+STRAIGHT_HIGH = [_straight_high(bits) for bits in range(1 << 13)]
+
+# The rank table is keyed by a perfect hash of the rank histogram: three bits
+# per rank holding how many cards of that rank are present.
+RANK_TABLE = _build_rank_table()
+FLUSH_TABLE = _build_flush_table()
+SPREAD_TABLE = _build_spread_table()
+
+
+def evaluate_state(key: int, mask: int) -> int:
+    """Evaluate from a rank-histogram key and a 52-bit card mask"""
+    flush = (FLUSH_TABLE[mask & SUIT_MASK] or FLUSH_TABLE[(mask >> 13) & SUIT_MASK]
+             or FLUSH_TABLE[(mask >> 26) & SUIT_MASK] or FLUSH_TABLE[mask >> 39])
+    if flush:
+        return flush
+    return RANK_TABLE[key]
+
+
+def evaluate_mask(mask: int) -> int:
+    """Evaluate a set of up to 7 cards given as a 52-bit card mask"""
+    key = (SPREAD_TABLE[mask & SUIT_MASK] + SPREAD_TABLE[(mask >> 13) & SUIT_MASK]
+           + SPREAD_TABLE[(mask >> 26) & SUIT_MASK] + SPREAD_TABLE[mask >> 39])
+    return evaluate_state(key, mask)
+
+
+def evaluate_codes(codes: Iterable[int]) -> int:
+    """Evaluate up to 7 distinct cards given as card codes"""
+    key = 0
+    mask = 0
+    for code in codes:
+        key += RANK_KEY[code]
+        mask |= 1 << code
+    return evaluate_state(key, mask)
+
+
+class BoardEvaluator:
+    def __init__(self, board: Iterable[int]):
+        """
+        A board folded into evaluator state once, so each player's hand costs only
+        its two hole cards. Two hole cards can only complete a flush in a suit
+        that already has three board cards, so at most one suit is ever checked.
+        """
+        self.board = tuple(board)
+        self.key = 0
+        self.mask = 0
+        for code in self.board:
+            self.key += RANK_KEY[code]
+            self.mask |= 1 << code
+        self.flush_shift = -1
+        for suit in range(4):
+            if bin((self.mask >> (13 * suit)) & SUIT_MASK).count('1') >= 3:
+                self.flush_shift = 13 * suit
+
+    def evaluate(self, first: int, second: int) -> int:
+        """Strength of two hole cards on this board"""
+        if self.flush_shift >= 0:
+            flush = FLUSH_TABLE[((self.mask | (1 << first) | (1 << second)) >> self.flush_shift) & SUIT_MASK]
+            if flush:
+                return flush
+        return RANK_TABLE[self.key + RANK_KEY[first] + RANK_KEY[second]]
+
+
+# Boards and (board, hole) strengths kept for repeated queries
+BOARD_CACHE_SIZE = 4096
+STRENGTH_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=BOARD_CACHE_SIZE)
+def board_evaluator(board: Tuple[int, ...]) -> BoardEvaluator:
+    """The BoardEvaluator of a board, built once per distinct board"""
+    return BoardEvaluator(board)
+
+
+@lru_cache(maxsize=STRENGTH_CACHE_SIZE)
+def evaluate_hole(board: Tuple[int, ...], first: int, second: int) -> int:
+    """Strength of two hole cards (lower code first) on a board, remembered for repeated queries"""
+    return board_evaluator(board).evaluate(first, second)
@@ -0,0 +1,56 @@
+import pygame
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Default memory budget for cached text surfaces
+TEXT_CACHE_BYTES = 8 * 1024 * 1024
+
+_fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+def get_font(size: int, name: Optional[str] = None) -> pygame.font.Font:
+    """Load a font once per (name, size) and reuse it afterwards"""
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = pygame.font.Font(name, size)
+    return font
+
+class TextCache:
+    def __init__(self, budget: int = TEXT_CACHE_BYTES):
+        """LRU cache of rendered text surfaces, evicting the oldest once `budget` bytes are held"""
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: 'OrderedDict[Tuple[str, int, Tuple[int, int, int]], pygame.Surface]' = OrderedDict()
+
+    def render(self, text: str, size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Rendered, antialiased text in the default font"""
+        key = (text, size, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = get_font(size).render(text, True, color)
+        self._surfaces[key] = surface
+        self.size += self._bytes(surface)
+        while self.size > self.budget and len(self._surfaces) > 1:
+            _, oldest = self._surfaces.popitem(last=False)
+            self.size -= self._bytes(oldest)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self.size = 0
+
+    @staticmethod
+    def _bytes(surface: pygame.Surface) -> int:
+        return surface.get_pitch() * surface.get_height()
+
+# Shared cache used by the UI
+text_cache = TextCache()
+
+def render_text(text: str, size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+    return text_cache.render(text, size, color)
@@ -1,99 +1,71 @@
 import random
-from typing import List, Tuple
-from models import Card
+import numpy as np
+from typing import List, Tuple, Union
+from models import Card, to_codes
+from evaluator import decode_strength, evaluate_codes, evaluate_hole, evaluate_mask
+from batch_evaluator import evaluate_batch
 
 class PokerHand:
     @staticmethod
-    def evaluate_hand(hole_cards: List[Card], community_cards: List[Card]) -> Tuple[int, List[int]]:
+    def evaluate_hand(hole_cards: List[Union[Card, int]], community_cards: List[Union[Card, int]]) -> Tuple[int, List[int]]:
         """
         Evaluate a poker hand and return a tuple of (hand_rank, kickers)
         hand_rank: 0 (high card) to 9 (royal flush)
         kickers: list of card values used to break ties
         """
-        all_cards = hole_cards + community_cards
-        values = [card.value for card in all_cards]
-        suits = [card.suit for card in all_cards]
-        
-        # Convert values to numbers for easier comparison
-        value_map = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, 
-                    '9': 9, '10': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
-        numeric_values = [value_map[v] for v in values]
-        
-        # Check for flush
-        flush = any(suits.count(suit) >= 5 for suit in set(suits))
-        
-        # Check for straight
-        unique_values = sorted(set(numeric_values))
-        straight = False
-        for i in range(len(unique_values) - 4):
-            if unique_values[i+4] - unique_values[i] == 4:
-                straight = True
-                break
-        
-        # Royal flush
-        if flush and straight and max(numeric_values) == 14 and min(numeric_values) == 10:
-            return (9, [])
-        
-        # Straight flush
-        if flush and straight:
-            return (8, [max(numeric_values)])
-        
-        # Four of a kind
-        for value in set(numeric_values):
-            if numeric_values.count(value) == 4:
-                kickers = [v for v in numeric_values if v != value]
-                return (7, [value] + sorted(kickers, reverse=True)[:1])
-        
-        # Full house
-        three_kind = None
-        pair = None
-        for value in set(numeric_values):
-            count = numeric_values.count(value)
-            if count == 3:
-                three_kind = value
-            elif count == 2:
-                pair = value
-        if three_kind and pair:
-            return (6, [three_kind, pair])
-        
-        # Flush
-        if flush:
-            flush_values = [v for v, s in zip(numeric_values, suits) 
-                          if s == max(set(suits), key=suits.count)]
-            return (5, sorted(flush_values, reverse=True)[:5])
-        
-        # Straight
-        if straight:
-            return (4, [max(numeric_values)])
-        
-        # Three of a kind
-        if three_kind:
-            kickers = [v for v in numeric_values if v != three_kind]
-            return (3, [three_kind] + sorted(kickers, reverse=True)[:2])
-        
-        # Two pair
-        pairs = [v for v in set(numeric_values) if numeric_values.count(v) == 2]
-        if len(pairs) >= 2:
-            pairs.sort(reverse=True)
-            kickers = [v for v in numeric_values if v not in pairs[:2]]
-            return (2, pairs[:2] + sorted(kickers, reverse=True)[:1])
-        
-        # One pair
-        if pair:
-            kickers = [v for v in numeric_values if v != pair]
-            return (1, [pair] + sorted(kickers, reverse=True)[:3])
-        
-        # High card
-        return (0, sorted(numeric_values, reverse=True)[:5])
+        return decode_strength(PokerHand.evaluate_strength(hole_cards, community_cards))
+
+    @staticmethod
+    def evaluate_strength(hole_cards: List[Union[Card, int]], community_cards: List[Union[Card, int]]) -> int:
+        """
+        Evaluate a poker hand of up to 7 cards and return a single integer strength.
+        A higher strength always beats a lower one and equal strengths split.
+        """
+        return PokerHand.evaluate_codes(to_codes(hole_cards) + to_codes(community_cards))
+
+    @staticmethod
+    def evaluate_codes(codes: List[int]) -> int:
+        """Evaluate up to 7 distinct cards given as card codes"""
+        return evaluate_codes(codes)
+
+    @staticmethod
+    def evaluate_hole(hole_cards: List[Union[Card, int]], community_cards: List[Union[Card, int]]) -> int:
+        """
+        Strength of two hole cards on a board. The board is preprocessed once and
+        results are kept in an LRU cache, so repeated and same-board queries are cheap.
+        """
+        first, second = to_codes(hole_cards)
+        if first > second:
+            first, second = second, first
+        return evaluate_hole(tuple(to_codes(community_cards)), first, second)
+
+    @staticmethod
+    def evaluate_mask(mask: int) -> int:
+        """Evaluate up to 7 cards given as a 52-bit card mask"""
+        return evaluate_mask(mask)
+
+    @staticmethod
+    def evaluate_batch(hole: np.ndarray, board: np.ndarray) -> np.ndarray:
+        """
+        Evaluate many hands at once with vectorized table lookups
+        hole: card codes of shape (N, 2), board: card codes of shape (N, 5)
+        Returns N strengths that order hands exactly like evaluate_strength.
+        """
+        return evaluate_batch(hole, board)
 
 class GameLogic:
     @staticmethod
-    def shuffle_deck(deck: List[Card]) -> List[Card]:
+    def new_deck() -> List[int]:
+        """Create an ordered deck of card codes"""
+        return list(range(52))
+
+    @staticmethod
+    def shuffle_deck(deck: List[int]) -> List[int]:
         """Shuffle the deck of cards"""
         return random.sample(deck, len(deck))
     
     @staticmethod
-    def deal_cards(deck: List[Card], num_players: int) -> Tuple[List[List[Card]], List[Card]]:
+    def deal_cards(deck: List[int], num_players: int) -> Tuple[List[List[int]], List[int]]:
         """Deal 2 cards to each player and return the remaining deck"""
         hands = [[] for _ in range(num_players)]
         for _ in range(2):
@@ -103,7 +75,7 @@ class GameLogic:
         return hands, deck
     
     @staticmethod
-    def deal_community_cards(deck: List[Card], num_cards: int) -> Tuple[List[Card], List[Card]]:
+    def deal_community_cards(deck: List[int], num_cards: int) -> Tuple[List[int], List[int]]:
         """Deal community cards and return the remaining deck"""
         community = []
         for _ in range(num_cards):
@@ -112,29 +84,29 @@ class GameLogic:
         return community, deck
     
     @staticmethod
-    def get_winner(players: List[dict], community_cards: List[Card]) -> List[int]:
+    def get_winner(players: List[dict], community_cards: List[Union[Card, int]]) -> List[int]:
         """
         Determine the winner(s) of the hand
         Returns a list of player indices who won (for split pots)
         """
-        best_hand = -1
+        board = tuple(to_codes(community_cards))
+        best_strength = -1
         winners = []
         
         for i, player in enumerate(players):
             if player['folded']:
                 continue
                 
-            hand_rank, kickers = PokerHand.evaluate_hand(player['hand'], community_cards)
+            first, second = to_codes(player['hand'])
+            if first > second:
+                first, second = second, first
+            strength = evaluate_hole(board, first, second)
             
-            if hand_rank > best_hand:
-                best_hand = hand_rank
+            if strength > best_strength:
+                best_strength = strength
                 winners = [i]
-            elif hand_rank == best_hand:
-                # Compare kickers
-                if kickers > winners_kickers:
-                    winners = [i]
-                elif kickers == winners_kickers:
-                    winners.append(i)
-                winners_kickers = kickers
+            elif strength == best_strength:
+                # Equal strengths split the pot
+                winners.append(i)
         
         return winners 
\ No newline at end of file
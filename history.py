@@ -0,0 +1,245 @@
+import os
+import queue
+import struct
+import threading
+import time
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from engine import (Event, TableEngine, BLIND, BOARD, CALL, CHECK, FOLD, HAND_END, HAND_START,
+                    HOLE_CARDS, POT, RAISE, WIN)
+
+# File layout: a 6-byte header, then one record per hand, each prefixed with its
+# payload length as a little-endian uint32. A payload holds
+#   hand number (u64), dealer seat (u8), seat count (u8), small blind, big blind and ante (u32 each),
+#   deck seed (u64)
+#   per seat: starting chips (u32) and two hole card codes (u8, 255 when not dealt)
+#   events in the order they happened: kind (u8) then
+#     BOARD: card count (u8) and the card codes (u8 each)
+#     others: seat (u8, 255 for none) and chips moved (u32)
+_MAGIC = b'PKHH'
+_VERSION = 3
+_FILE_HEADER = struct.Struct('<4sH')
+_LENGTH = struct.Struct('<I')
+_HAND = struct.Struct('<QBBIIIQ')
+_SEAT = struct.Struct('<IBB')
+_EVENT = struct.Struct('<BBI')
+_BOARD = struct.Struct('<BB')
+NO_CARD = 255
+
+# Event kinds in the order of their codes in the file
+EVENT_KINDS = [BLIND, FOLD, CHECK, CALL, RAISE, BOARD, POT, WIN]
+_EVENT_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+_BOARD_CODE = _EVENT_CODES[BOARD]
+
+# Bytes gathered before a batch is handed to the writer thread
+BATCH_BYTES = 1 << 20
+# A batch is also handed over after this many hands, or once this long has passed since the last
+FLUSH_HANDS = 256
+FLUSH_SECONDS = 1.0
+
+class HandRecord:
+    def __init__(self, hand_number: int, dealer: int, seats: List[Tuple[int, List[int]]], events: List[Event],
+                 blinds: Tuple[int, int, int] = (10, 20, 0), seed: Optional[int] = None):
+        self.hand_number = hand_number
+        self.dealer = dealer
+        self.blinds = blinds  # (small blind, big blind, ante)
+        self.seed = seed  # Seed of the table's deck; with the hand number it fixes the deal
+        self.seats = seats  # (starting chips, hole card codes) per seat
+        self.events = events
+
+    @property
+    def board(self) -> List[int]:
+        return [code for event in self.events if event.kind == BOARD for code in event.cards]
+
+    @property
+    def pots(self) -> List[int]:
+        return [event.amount for event in self.events if event.kind == POT]
+
+    @property
+    def winners(self) -> List[Tuple[int, int]]:
+        """(seat, chips) for every share of every pot"""
+        return [(event.seat, event.amount) for event in self.events if event.kind == WIN]
+
+    def __repr__(self):
+        return f"HandRecord(#{self.hand_number}, dealer={self.dealer}, seats={len(self.seats)}, events={len(self.events)})"
+
+class HistoryWriter:
+    def __init__(self, path: str, batch_bytes: int = BATCH_BYTES, flush_hands: int = FLUSH_HANDS,
+                 flush_seconds: float = FLUSH_SECONDS):
+        """
+        Append hand records to `path`. Records are gathered in memory and handed
+        to a background thread in batches, so callers never wait on the disk.
+        A batch closes at `batch_bytes`, after `flush_hands` hands or `flush_seconds`
+        seconds, whichever comes first, so a crash loses at most one batch.
+        """
+        self.batch_bytes = batch_bytes
+        self.flush_hands = flush_hands
+        self.flush_seconds = flush_seconds
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            # An empty file, such as one left by a crash before the first batch, starts afresh
+            self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION))
+            self._file.flush()
+        else:
+            with open(path, 'rb') as existing:
+                _check_header(existing, path)
+        self._buffer = bytearray()
+        self._hands = 0  # Hands in the buffer
+        self._flushed = time.monotonic()
+        self._queue: 'queue.Queue[Optional[bytes]]' = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, payload: bytes):
+        """Queue one encoded hand"""
+        self._buffer += _LENGTH.pack(len(payload))
+        self._buffer += payload
+        self._hands += 1
+        if (len(self._buffer) >= self.batch_bytes or self._hands >= self.flush_hands
+                or time.monotonic() - self._flushed >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Hand everything written so far to the writer thread"""
+        if self._buffer:
+            self._queue.put(bytes(self._buffer))
+            self._buffer = bytearray()
+        self._hands = 0
+        self._flushed = time.monotonic()
+
+    def close(self):
+        """Write out every queued hand and close the file"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    def _drain(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+            self._file.write(batch)
+            self._file.flush()
+
+class HandRecorder:
+    def __init__(self, engine: TableEngine, writer: HistoryWriter):
+        """Listen to `engine` and write every hand it finishes to `writer`"""
+        self.engine = engine
+        self.writer = writer
+        self._header = b''
+        self._chips: List[int] = []
+        self._holes: List[List[int]] = []
+        self._events = bytearray()
+        engine.add_listener(self.on_event)
+
+    def on_event(self, event: Event):
+        kind = event.kind
+        code = _EVENT_CODES.get(kind)
+        if code is not None:
+            if code == _BOARD_CODE:
+                self._events += _BOARD.pack(code, len(event.cards))
+                self._events += bytes(event.cards)
+            else:
+                self._events += _EVENT.pack(code, event.seat if event.seat >= 0 else 255, event.amount)
+        elif kind == HOLE_CARDS:
+            self._holes[event.seat] = event.cards
+        elif kind == HAND_START:
+            players = self.engine.players
+            engine = self.engine
+            self._header = _HAND.pack(engine.hand_number, event.seat, len(players),
+                                      engine.small_blind, engine.big_blind, engine.ante, engine.shuffler.seed)
+            self._chips = [player.chips for player in players]
+            self._holes = [[]] * len(players)
+            self._events = bytearray()
+        elif kind == HAND_END:
+            self.writer.write(self._encode())
+
+    def _encode(self) -> bytes:
+        seats = b''.join(_SEAT.pack(chips, *(list(hole) + [NO_CARD, NO_CARD])[:2])
+                         for chips, hole in zip(self._chips, self._holes))
+        return self._header + seats + self._events
+
+def _check_header(file: BinaryIO, path: str):
+    header = file.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size:
+        raise ValueError(f"{path} is not a hand history log")
+    magic, version = _FILE_HEADER.unpack(header)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path} is not a hand history log")
+
+def decode_hand(payload: bytes) -> HandRecord:
+    """Decode one record payload"""
+    hand_number, dealer, seat_count, small_blind, big_blind, ante, seed = _HAND.unpack_from(payload, 0)
+    offset = _HAND.size
+    seats = []
+    for _ in range(seat_count):
+        chips, first, second = _SEAT.unpack_from(payload, offset)
+        offset += _SEAT.size
+        seats.append((chips, [code for code in (first, second) if code != NO_CARD]))
+    events = []
+    while offset < len(payload):
+        code = payload[offset]
+        if code == _BOARD_CODE:
+            count = payload[offset + 1]
+            offset += _BOARD.size
+            events.append(Event(BOARD, cards=list(payload[offset:offset + count])))
+            offset += count
+        else:
+            _, seat, amount = _EVENT.unpack_from(payload, offset)
+            offset += _EVENT.size
+            events.append(Event(EVENT_KINDS[code], seat if seat != 255 else -1, amount))
+    return HandRecord(hand_number, dealer, seats, events, (small_blind, big_blind, ante), seed)
+
+def read_hands(path: str, buffer_size: int = BATCH_BYTES) -> Iterator[HandRecord]:
+    """Yield the hands in a log one at a time, reading the file as it goes"""
+    with open(path, 'rb', buffering=buffer_size) as file:
+        _check_header(file, path)
+        while True:
+            prefix = file.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return  # End of file, or a record cut short by a crash
+            (length,) = _LENGTH.unpack(prefix)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            yield decode_hand(payload)
+
+def record_offsets(path: str, start: Optional[int] = None) -> Iterator[int]:
+    """Yield the file offset of every complete record, from `start` or the first record on"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        _check_header(file, path)
+        offset = _FILE_HEADER.size if start is None else start
+        while offset + _LENGTH.size <= size:
+            file.seek(offset)
+            (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+            if offset + _LENGTH.size + length > size:
+                break
+            yield offset
+            offset += _LENGTH.size + length
+
+def read_hand_at(file: BinaryIO, offset: int) -> Tuple[HandRecord, int]:
+    """Decode the record at `offset` of an open log, returning it with the next record's offset"""
+    file.seek(offset)
+    (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+    return decode_hand(file.read(length)), offset + _LENGTH.size + length
+
+def skip_hands(file: BinaryIO, offset: int, count: int) -> int:
+    """Offset of the record `count` records after the one at `offset`, reading only length prefixes"""
+    for _ in range(count):
+        file.seek(offset)
+        (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+        offset += _LENGTH.size + length
+    return offset
+
+def count_hands(path: str) -> int:
+    """Count the hands in a log by skipping from one length prefix to the next"""
+    return sum(1 for _ in record_offsets(path))
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import random
+import resource
+import time
+from typing import List, Optional
+from engine import CALL, FOLD, RAISE
+import protocol
+
+class Bot(asyncio.Protocol):
+    def __init__(self, name: str, rng: random.Random, latencies: List[float], counts: List[int], think: float):
+        self.name = name
+        self.think = think  # Mean seconds spent deciding on an action
+        self.rng = rng
+        self.latencies = latencies  # Seconds from sending an action to seeing it broadcast
+        self.counts = counts  # [messages received, actions sent]
+        self.reader = protocol.FrameReader()
+        self.transport: Optional[asyncio.Transport] = None
+        self.seat = -1
+        self.sent_at = 0.0
+        self.seated = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        transport.write(protocol.encode_join(self.name))
+
+    def data_received(self, data: bytes):
+        for payload in self.reader.feed(data):
+            self.counts[0] += 1
+            message = payload[0]
+            if message == protocol.EVENT:
+                if self.sent_at and payload[2] == self.seat and protocol.EVENT_KINDS[payload[1]] in protocol.ACTION_CODES:
+                    self.latencies.append(time.perf_counter() - self.sent_at)
+                    self.sent_at = 0.0
+            elif message == protocol.TURN:
+                seat, to_call, min_raise, max_raise = protocol.decode_turn(payload)
+                if seat == self.seat:
+                    if self.think:
+                        delay = self.rng.expovariate(1 / self.think)
+                        asyncio.get_running_loop().call_later(delay, self.act, to_call, min_raise, max_raise)
+                    else:
+                        self.act(to_call, min_raise, max_raise)
+            elif message == protocol.SEATED:
+                _, self.seat = protocol.decode_seated(payload)
+                self.seated.set_result(None)
+
+    def act(self, to_call: int, min_raise: int, max_raise: int):
+        if self.transport.is_closing():
+            return
+        roll = self.rng.random()
+        if roll < 0.1 and to_call:
+            message = protocol.encode_act(FOLD)
+        elif roll < 0.85 or max_raise <= min_raise:
+            message = protocol.encode_act(CALL)
+        else:
+            message = protocol.encode_act(RAISE, self.rng.randint(min_raise, max_raise))
+        self.counts[1] += 1
+        self.sent_at = time.perf_counter()
+        self.transport.write(message)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if not self.seated.done():
+            self.seated.set_exception(ConnectionError(f"{self.name} was disconnected"))
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+async def run(host: str, port: int, seats: int, duration: float, think: float, seed: Optional[int]):
+    """Seat `seats` bots, let them play for `duration` seconds and report latency and throughput"""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    counts = [0, 0]
+    bots = []
+    for i in range(seats):
+        _, bot = await loop.create_connection(
+            lambda i=i: Bot(f"bot{i}", random.Random(rng.getrandbits(32)), latencies, counts, think), host, port)
+        bots.append(bot)
+    await asyncio.gather(*(bot.seated for bot in bots))
+    print(f"Seated {seats} bots", flush=True)
+
+    # Only measure steady-state play
+    latencies.clear()
+    counts[:] = [0, 0]
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - started
+    for bot in bots:
+        bot.transport.close()
+
+    print(f"{counts[1] / elapsed:.0f} actions/s, {counts[0] / elapsed:.0f} messages/s")
+    print("action-to-broadcast latency: " + ", ".join(
+        f"p{int(fraction * 100)} {percentile(latencies, fraction) * 1000:.2f}ms" for fraction in (0.5, 0.9, 0.99)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test a table server with seated bots over localhost")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seats', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--think', type=float, default=0.5,
+                        help="mean seconds a bot waits before acting; 0 saturates the server")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    # Every bot needs a socket; raise the open file limit as far as allowed
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    asyncio.run(run(args.host, args.port, args.seats, args.duration, args.think, args.seed))
@@ -1,7 +1,16 @@
+import argparse
 import pygame
 import sys
+import time
 from typing import List, Tuple, Optional
-from game_logic import GameLogic, PokerHand
+from engine import Action, Event, TableEngine, BOARD, FOLD, HAND_START, HOLE_CARDS, RAISE
+from equity import EquityCalculator
+from columns import ColumnRecorder, ColumnWriter
+from fonts import render_text
+from history import HandRecorder, HistoryWriter
+import profiling
+from renderer import Renderer
+from replay import Replayer
 from ui import UI
 from models import Card, Player
 
@@ -15,28 +24,53 @@ CARD_WIDTH = 100
 CARD_HEIGHT = 140
 FPS = 60
 
+# Posted every PROFILE_INTERVAL milliseconds while the profiling overlay is shown
+PROFILE_TICK = pygame.USEREVENT + 2
+PROFILE_INTERVAL = 500
+PROFILE_PATH = "profile.json"
+STACKS_PATH = "profile.folded"
+
 # Colors
 BLACK = (0, 0, 0)
 GREEN = (0, 128, 0)
 WHITE = (255, 255, 255)
 
 class PokerGame:
-    def __init__(self):
+    # Top of the community cards and width of each player's screen region
+    COMMUNITY_Y = 100
+    PLAYER_AREA_WIDTH = 380
+
+    def __init__(self, profile: bool = False, history: Optional[str] = None, columns: Optional[str] = None):
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Poker Game")
         self.clock = pygame.time.Clock()
         self.ui = UI(self.screen)
         self.players: List[Player] = []
-        self.deck: List[Card] = []
         self.community_cards: List[Card] = []
-        self.current_player = 0
-        self.pot = 0
-        self.current_bet = 0
-        self.small_blind = 10
-        self.big_blind = 20
-        self.dealer = 0
-        self.game_phase = "preflop"  # preflop, flop, turn, river, showdown
+        # One Card per code, reused every hand; each is dealt at most once per hand
+        self.cards = [Card.from_code(code) for code in range(52)]
+        self.engine = TableEngine(self.players, small_blind=10, big_blind=20)
+        self.engine.add_listener(self.handle_engine_event)
+        # Hands played are appended to the `history` log, if given
+        self.history = HistoryWriter(history, flush_hands=1) if history else None
+        if self.history:
+            HandRecorder(self.engine, self.history)
+        # and their actions and results to the `columns` store for player stats
+        self.columns = ColumnWriter(columns) if columns else None
+        if self.columns:
+            ColumnRecorder(self.engine, self.columns)
+        self.equity_calculator = EquityCalculator(workers=1)
+        self.all_in_equity: Optional[List[Optional[float]]] = None
+        self.all_in_equity_key = None
+        self.renderer = Renderer(self.screen, GREEN)
+        self.sampler: Optional[profiling.Sampler] = None
+        self.frame_times: List[int] = []
+        self.overlay_text = ""
         self.setup_game()
+        self.setup_regions()
+        self.setup_controls()
+        if profile:
+            self.toggle_profiling()
 
     def setup_game(self):
         # Create players in a horizontal line across the middle of the screen
@@ -56,55 +90,44 @@ class PokerGame:
         for i in range(4):
             self.players.append(Player(f"Player {i+1}", positions[i]))
 
-        self.start_new_hand()
+        self.engine.start_new_hand()
 
-    def start_new_hand(self):
-        # Reset game state
-        self.community_cards = []
-        self.pot = 0
-        self.current_bet = 0
-        self.game_phase = "preflop"
-        
-        # Reset player states
-        for player in self.players:
-            player.hand = []
-            player.bet = 0
-            player.folded = False
-            player.is_all_in = False
-
-        # Initialize and shuffle deck
-        suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-        values = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        self.deck = [Card(suit, value) for suit in suits for value in values]
-        self.deck = GameLogic.shuffle_deck(self.deck)
-
-        # Deal cards
-        hands, self.deck = GameLogic.deal_cards(self.deck, len(self.players))
-        for i, player in enumerate(self.players):
-            player.hand = hands[i]
+    def handle_engine_event(self, event: Event):
+        """Keep the displayed cards in sync with the engine"""
+        if event.kind == HAND_START:
+            self.community_cards = []
+        elif event.kind == HOLE_CARDS:
+            player = self.players[event.seat]
+            player.hand = [self.cards[code] for code in event.cards]
             for card in player.hand:
                 card.face_up = True
+        elif event.kind == FOLD:
+            # Hide the player's cards when they fold
+            for card in self.players[event.seat].hand:
+                card.face_up = False
+        elif event.kind == BOARD:
+            for code in event.cards:
+                card = self.cards[code]
+                card.face_up = True
+                self.community_cards.append(card)
 
-        # Post blinds
-        sb_pos = (self.dealer + 1) % len(self.players)
-        bb_pos = (self.dealer + 2) % len(self.players)
-        
-        self.players[sb_pos].chips -= self.small_blind
-        self.players[sb_pos].bet = self.small_blind
-        self.players[bb_pos].chips -= self.big_blind
-        self.players[bb_pos].bet = self.big_blind
-        
-        self.pot = self.small_blind + self.big_blind
-        self.current_bet = self.big_blind
-        self.current_player = (bb_pos + 1) % len(self.players)
-
-    def handle_events(self) -> bool:
-        for event in pygame.event.get():
+    def handle_events(self, wait: bool = False) -> bool:
+        # When nothing is animating, sleep until the next event instead of polling
+        events = pygame.event.get()
+        if wait and not events:
+            events = [pygame.event.wait()]
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
+                elif event.key == pygame.K_F3:
+                    self.toggle_profiling()
+                elif event.key == pygame.K_F4:
+                    self.toggle_sampler()
+                else:
+                    self.handle_key(event.key)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
                     action = self.ui.handle_click(event.pos)
@@ -115,282 +138,272 @@ class PokerGame:
                     self.ui.handle_mouse_up()
             elif event.type == pygame.MOUSEMOTION:
                 self.ui.handle_mouse_motion(event.pos)
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.renderer.invalidate()
+            elif event.type == PROFILE_TICK:
+                self.update_overlay()
+            else:
+                self.handle_other_event(event)
         return True
 
     def handle_player_action(self, action: str):
-        current_player = self.players[self.current_player]
-        
-        if action == "fold":
-            current_player.folded = True
-            # Hide the player's cards when they fold
-            for card in current_player.hand:
-                card.face_up = False
-            self.next_player()
-            
-        elif action == "check":
-            # Only allow check if no bet has been made in this round
-            if self.current_bet == current_player.bet:
-                self.next_player()
-            else:
-                # If there's a bet, this should be a call instead
-                self.handle_call(current_player)
-                
-        elif action == "call":
-            self.handle_call(current_player)
-            
-        elif action == "raise":
-            # Minimum raise must be at least the size of the previous bet/raise
-            min_raise = self.current_bet + (self.current_bet - current_player.bet)
-            max_raise = current_player.chips + current_player.bet
-            raise_amount = self.ui.get_bet_amount(min_raise, max_raise)
-            
-            if raise_amount > self.current_bet:
-                self.current_bet = raise_amount
-                call_amount = raise_amount - current_player.bet
-                
-                if current_player.chips >= call_amount:
-                    current_player.chips -= call_amount
-                    current_player.bet += call_amount
-                    self.pot += call_amount
-                else:
-                    # All-in
-                    all_in_amount = current_player.chips
-                    current_player.chips = 0
-                    current_player.bet += all_in_amount
-                    self.pot += all_in_amount
-                    current_player.is_all_in = True
-                self.next_player()
-
-    def handle_call(self, player: Player):
-        """Handle a call action for a player"""
-        call_amount = self.current_bet - player.bet
-        if call_amount > 0:
-            if player.chips >= call_amount:
-                player.chips -= call_amount
-                player.bet += call_amount
-                self.pot += call_amount
-            else:
-                # All-in
-                all_in_amount = player.chips
-                player.chips = 0
-                player.bet += all_in_amount
-                self.pot += all_in_amount
-                player.is_all_in = True
-        self.next_player()
-
-    def get_active_players(self) -> List[Player]:
-        """Get list of players who haven't folded"""
-        return [p for p in self.players if not p.folded]
-
-    def next_player(self):
-        # Find next active player
-        next_player = (self.current_player + 1) % len(self.players)
-        active_players = self.get_active_players()
-        
-        # If only one player remains, go to showdown
-        if len(active_players) == 1:
-            self.showdown()
-            return
-            
-        # Skip folded players and players who are all-in
-        while (self.players[next_player].folded or 
-               self.players[next_player].is_all_in):
-            next_player = (next_player + 1) % len(self.players)
-            if next_player == self.current_player:
-                # Round is complete
-                self.next_phase()
-                return
-        
-        # Check if we've completed a round of betting
-        if self.is_betting_round_complete():
-            self.next_phase()
+        """Turn a button press into an engine action, reading raise sizes from the slider"""
+        if self.engine.game_phase == "game_over":
             return
-        
-        self.current_player = next_player
+        amount = 0
+        if action == RAISE:
+            min_raise, max_raise = self.engine.raise_bounds()
+            amount = self.ui.get_bet_amount(min_raise, max_raise)
+        self.engine.act(Action(action, amount))
 
-    def is_betting_round_complete(self) -> bool:
-        """Check if the current betting round is complete according to Texas Hold'em rules."""
-        active_players = self.get_active_players()
+    def get_all_in_equity(self) -> Optional[List[Optional[float]]]:
+        """Exact equity per player once the hand is all-in from the flop on, else None"""
+        active = [i for i, p in enumerate(self.players) if not p.folded]
+        all_in = tuple(self.players[i].is_all_in for i in active)
+        key = (tuple(active), all_in, tuple(self.engine.board))
         
-        # If only one player remains, round is complete
-        if len(active_players) == 1:
-            return True
-            
-        # Get the last player to act in this round (varies by phase)
-        last_to_act = self.get_last_to_act()
-        
-        # If we've gone all the way around to the last player to act
-        if self.current_player == last_to_act:
-            # Check if all active players have either:
-            # 1. Matched the current bet
-            # 2. Are all-in
-            # 3. Have folded
-            for player in active_players:
-                if not player.folded and not player.is_all_in and player.bet != self.current_bet:
-                    return False
-            return True
-            
-        # If we've gone all the way around and all active players have acted
-        if self.have_all_active_players_acted():
-            # Check if all active players have either:
-            # 1. Matched the current bet
-            # 2. Are all-in
-            # 3. Have folded
-            for player in active_players:
-                if not player.folded and not player.is_all_in and player.bet != self.current_bet:
-                    return False
-            return True
-            
-        return False
-
-    def have_all_active_players_acted(self) -> bool:
-        """Check if all active players have had a chance to act in the current betting round."""
-        active_players = self.get_active_players()
-        if not active_players:
-            return True
-            
-        # Get the last player to act in this round
-        last_to_act = self.get_last_to_act()
-        
-        # If we've gone all the way around to the last player to act
-        if self.current_player == last_to_act:
-            return True
-            
-        # Check if we've gone all the way around the table
-        # Start from the last player who made a bet/raise
-        last_bettor = self.get_last_bettor()
-        if last_bettor is None:
-            return False
-            
-        # If we've gone all the way around from the last bettor
-        return self.current_player == last_bettor
-
-    def get_last_bettor(self) -> Optional[int]:
-        """Get the position of the last player who made a bet or raise."""
-        active_players = self.get_active_players()
-        if not active_players:
-            return None
-            
-        # Find the last player who made a bet
-        last_bettor = None
+        # Only recompute when the players or the board have changed
+        if key != self.all_in_equity_key:
+            self.all_in_equity_key = key
+            self.all_in_equity = None
+            still_betting = all_in.count(False)
+            if len(active) >= 2 and any(all_in) and still_betting <= 1 and len(self.engine.board) >= 3:
+                result = self.equity_calculator.calculate_exact(
+                    [self.players[i].hole for i in active], self.engine.board)
+                self.all_in_equity = [None] * len(self.players)
+                for i, equity in zip(active, result.equity):
+                    self.all_in_equity[i] = equity
+        return self.all_in_equity
+
+    def setup_regions(self):
+        """Split the table into regions that are repainted only when what they show changes"""
+        community_x, community_y = WINDOW_WIDTH // 2, self.COMMUNITY_Y
+        pot_x, pot_y = WINDOW_WIDTH - 150, 50
+        self.renderer.add(
+            "community", self.ui.community_area(community_x, community_y),
+            lambda: self.ui.draw_community_cards(self.community_cards, community_x, community_y),
+            lambda: tuple((card.code, card.face_up) for card in self.community_cards))
+        self.renderer.add(
+            "pot", self.ui.pot_area(pot_x, pot_y),
+            lambda: self.ui.draw_pot(self.engine.pot, pot_x, pot_y),
+            lambda: self.engine.pot)
         for i, player in enumerate(self.players):
-            if not player.folded and player.bet == self.current_bet:
-                last_bettor = i
-                
-        return last_bettor
-
-    def get_last_to_act(self) -> int:
-        """Determine who should be the last to act in the current betting round."""
-        if self.game_phase == "preflop":
-            # In preflop, the big blind acts last
-            return (self.dealer + 2) % len(self.players)
-        else:
-            # In other phases, the dealer acts last
-            return self.dealer
-
-    def next_phase(self):
-        if self.game_phase == "preflop":
-            self.game_phase = "flop"
-            self.deal_community_cards(3)
-        elif self.game_phase == "flop":
-            self.game_phase = "turn"
-            self.deal_community_cards(1)
-        elif self.game_phase == "turn":
-            self.game_phase = "river"
-            self.deal_community_cards(1)
-        elif self.game_phase == "river":
-            self.game_phase = "showdown"
-            self.showdown()
+            self.renderer.add(f"player {i}", self.ui.player_area(player, self.PLAYER_AREA_WIDTH),
+                              lambda i=i: self.draw_player(i), lambda i=i: self.player_state(i))
+
+    def setup_controls(self):
+        """Regions for the action buttons and the bet slider"""
+        self.renderer.add("buttons", self.ui.buttons_area(), self.ui.draw_buttons)
+        self.renderer.add("slider", self.ui.slider_area(), self.ui.draw_slider, lambda: self.ui.slider_pos)
+
+    def handle_key(self, key: int):
+        """Keyboard shortcuts; the table itself is played with the mouse"""
+
+    def handle_other_event(self, event: pygame.event.Event):
+        """Events the table does not use itself, such as timers"""
+
+    def player_state(self, i: int) -> tuple:
+        """Everything a player's region shows"""
+        player = self.players[i]
+        all_in_equity = self.get_all_in_equity()
+        blinds = tuple(i == seat for seat in self.engine.blind_seats)
+        return (player.name, player.chips, tuple((card.code, card.face_up) for card in player.hand),
+                i == self.engine.current_player, i == self.engine.dealer, blinds,
+                all_in_equity[i] if all_in_equity else None)
+
+    def draw_player(self, i: int):
+        player = self.players[i]
+        all_in_equity = self.get_all_in_equity()
+        self.ui.draw_player(
+            player, 
+            i == self.engine.current_player,
+            i == self.engine.dealer,
+            i == self.engine.blind_seats[0],
+            i == self.engine.blind_seats[1],
+            all_in_equity[i] if all_in_equity else None
+        )
+
+    def draw(self) -> bool:
+        """Repaint whatever changed; returns False when the frame was idle"""
+        return bool(self.renderer.render())
+
+    def toggle_profiling(self):
+        """F3: time the engine hot paths and every render stage, with a frame-time overlay"""
+        if profiling.is_enabled():
+            profiling.disable()
+            self.renderer.timings = None
+            self.renderer.regions.pop("profile", None)
+            pygame.time.set_timer(PROFILE_TICK, 0)
+            profiling.timings.export(PROFILE_PATH)
+            print(profiling.timings.summary())
+            print(f"Wrote timing histograms to {PROFILE_PATH}")
+            self.renderer.invalidate()
             return
+        profiling.enable()
+        self.renderer.timings = profiling.timings
+        self.frame_times = []
+        self.overlay_text = "measuring..."
+        self.setup_overlay()
+        pygame.time.set_timer(PROFILE_TICK, PROFILE_INTERVAL)
+
+    def setup_overlay(self):
+        self.renderer.add("profile", pygame.Rect(0, 0, 420, 28), self.draw_overlay, lambda: self.overlay_text)
 
-        # Reset betting for new phase
-        self.current_bet = 0
-        for player in self.players:
-            player.bet = 0
-            
-        # Find first active player after dealer
-        active_players = self.get_active_players()
-        if not active_players:
-            self.showdown()
+    def toggle_sampler(self):
+        """F4: start the sampling profiler, or stop it and write the stacks it collected"""
+        if self.sampler is None:
+            self.sampler = profiling.Sampler()
+            self.sampler.start()
+            print("Sampling profiler started")
             return
-            
-        # Set current player to first active player after dealer
-        self.current_player = (self.dealer + 1) % len(self.players)
-        while self.players[self.current_player].folded:
-            self.current_player = (self.current_player + 1) % len(self.players)
-
-    def deal_community_cards(self, num_cards: int):
-        cards, self.deck = GameLogic.deal_community_cards(self.deck, num_cards)
-        for card in cards:
-            card.face_up = True
-        self.community_cards.extend(cards)
-
-    def showdown(self):
-        # Find winner(s)
-        active_players = self.get_active_players()
-        if len(active_players) == 1:
-            winner = active_players[0]
-            winner.chips += self.pot
-        else:
-            # Evaluate hands and determine winner(s)
-            player_hands = []
-            for player in active_players:
-                hand_rank, kickers = PokerHand.evaluate_hand(player.hand, self.community_cards)
-                player_hands.append((player, hand_rank, kickers))
-            
-            # Sort by hand rank and kickers
-            player_hands.sort(key=lambda x: (x[1], x[2]), reverse=True)
-            
-            # Split pot among winners
-            best_hand_rank = player_hands[0][1]
-            best_kickers = player_hands[0][2]
-            winners = [p for p, rank, kickers in player_hands 
-                      if rank == best_hand_rank and kickers == best_kickers]
-            
-            split_amount = self.pot // len(winners)
-            for winner in winners:
-                winner.chips += split_amount
-
-        # Start new hand
-        self.dealer = (self.dealer + 1) % len(self.players)
-        self.start_new_hand()
-
-    def draw(self):
-        self.screen.fill(GREEN)
-        
-        # Draw community cards at the top
-        self.ui.draw_community_cards(self.community_cards, WINDOW_WIDTH // 2, 100)
-        
-        # Draw pot in upper right corner
-        self.ui.draw_pot(self.pot, WINDOW_WIDTH - 150, 50)
-        
-        # Draw players
-        for i, player in enumerate(self.players):
-            is_dealer = i == self.dealer
-            is_small_blind = i == (self.dealer + 1) % len(self.players)
-            is_big_blind = i == (self.dealer + 2) % len(self.players)
-            self.ui.draw_player(
-                player, 
-                i == self.current_player,
-                is_dealer,
-                is_small_blind,
-                is_big_blind
-            )
-        
-        # Draw UI elements
-        self.ui.draw_buttons()
-        
-        pygame.display.flip()
+        self.sampler.stop()
+        self.sampler.dump(STACKS_PATH)
+        print(f"Wrote {sum(self.sampler.stacks.values())} samples to {STACKS_PATH}")
+        self.sampler = None
+
+    def update_overlay(self):
+        """Summarise the frames drawn since the last update"""
+        frames = sorted(self.frame_times)
+        self.frame_times = []
+        if not frames:
+            self.overlay_text = "0 fps (idle)"
+            return
+        fps = len(frames) * 1000 / PROFILE_INTERVAL
+        mean = sum(frames) / len(frames) / 1e6
+        worst = frames[min(len(frames) - 1, int(len(frames) * 0.99))] / 1e6
+        self.overlay_text = f"{fps:.0f} fps  draw {mean:.2f}ms  p99 {worst:.2f}ms"
+
+    def draw_overlay(self):
+        surface = render_text(self.overlay_text, 24, WHITE)
+        self.screen.blit(surface, (6, 4))
+
+    def close(self):
+        # Keep the card faces drawn this session for the next start
+        self.ui.atlas.save()
+        if profiling.is_enabled():
+            self.toggle_profiling()
+        if self.sampler is not None:
+            self.toggle_sampler()
+        if self.history:
+            self.history.close()
+        if self.columns:
+            self.columns.close()
 
     def run(self):
         running = True
+        idle = False
         while running:
-            running = self.handle_events()
-            self.draw()
-            self.clock.tick(FPS)
+            running = self.handle_events(wait=idle)
+            if self.renderer.timings is None:
+                idle = not self.draw()
+            else:
+                started = time.perf_counter_ns()
+                idle = not self.draw()
+                if not idle:
+                    elapsed = time.perf_counter_ns() - started
+                    self.frame_times.append(elapsed)
+                    self.renderer.timings.add("frame", elapsed)
+            if not idle:
+                self.clock.tick(FPS)
+        self.close()
+
+# Posted by pygame.time.set_timer while a replay plays itself
+REPLAY_STEP = pygame.USEREVENT + 1
+
+class ReplayGame(PokerGame):
+    COMMUNITY_Y = 50
+
+    def __init__(self, path: str, hand: int = 0, profile: bool = False):
+        """Step through a hand history log on the table UI"""
+        self.path = path
+        self.start_hand = hand
+        self.autoplay = False
+        super().__init__(profile)
+
+    def setup_game(self):
+        self.replayer = Replayer(self.path, self.engine)
+        self.replayer.seek(self.start_hand)
+        self.layout_players()
+
+    def layout_players(self):
+        """Spread the seats over one row, or two rows of up to five"""
+        per_row = 4 if len(self.players) <= 4 else 5
+        rows = [self.players[i:i + per_row] for i in range(0, len(self.players), per_row)]
+        margin = 200
+        usable_width = WINDOW_WIDTH - (2 * margin)
+        spacing = usable_width // (per_row - 1)
+        self.PLAYER_AREA_WIDTH = min(PokerGame.PLAYER_AREA_WIDTH, spacing)
+        for row, players in enumerate(rows):
+            # Rows sit between the community cards and the status line
+            y = 330 + row * 336 if len(rows) > 1 else WINDOW_HEIGHT // 2
+            for i, player in enumerate(players):
+                player.position = (margin + spacing * i, y)
+
+    def setup_controls(self):
+        self.renderer.add("status", pygame.Rect(0, WINDOW_HEIGHT - 34, WINDOW_WIDTH, 34), self.draw_status,
+                          lambda: (self.replayer.hand_index, self.replayer.step_index, self.autoplay))
+
+    def draw_status(self):
+        replayer = self.replayer
+        text = (f"Hand {replayer.hand_index + 1}/{len(replayer)}  action {replayer.step_index}/{len(replayer.actions)}"
+                f"{'  playing' if self.autoplay else ''}   "
+                "Right: step   N/P: next/previous hand   Home/End: first/last hand   A: autoplay")
+        surface = render_text(text, 30, WHITE)
+        self.screen.blit(surface, surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 17)))
+
+    def show_hand(self, hand: int):
+        """Jump to the start of a hand, re-laying the table out if the seat count changed"""
+        seats = len(self.players)
+        self.replayer.seek(max(0, min(hand, len(self.replayer) - 1)))
+        self.layout_players()
+        if len(self.players) != seats:
+            self.renderer.regions.clear()
+            self.setup_regions()
+            self.setup_controls()
+            if profiling.is_enabled():
+                self.setup_overlay()
+        self.renderer.invalidate()
+
+    def handle_key(self, key: int):
+        replayer = self.replayer
+        if key in (pygame.K_RIGHT, pygame.K_SPACE):
+            self.step()
+        elif key == pygame.K_n:
+            self.show_hand(replayer.hand_index + 1)
+        elif key == pygame.K_p:
+            self.show_hand(replayer.hand_index - 1)
+        elif key == pygame.K_HOME:
+            self.show_hand(0)
+        elif key == pygame.K_END:
+            self.show_hand(len(replayer) - 1)
+        elif key == pygame.K_a:
+            self.autoplay = not self.autoplay
+            pygame.time.set_timer(REPLAY_STEP, 500 if self.autoplay else 0)
+
+    def step(self):
+        """Play the next recorded action, moving on to the next hand once this one is over"""
+        if not self.replayer.hand_over:
+            self.replayer.step()
+        elif self.replayer.hand_index + 1 < len(self.replayer):
+            self.show_hand(self.replayer.hand_index + 1)
+
+    def handle_other_event(self, event: pygame.event.Event):
+        if event.type == REPLAY_STEP and self.autoplay:
+            self.step()
+
+    def handle_player_action(self, action: str):
+        """The replay decides every action"""
 
 if __name__ == "__main__":
-    game = PokerGame()
+    parser = argparse.ArgumentParser(description="Play poker, or replay a hand history log")
+    parser.add_argument('--replay', metavar='LOG', help="step through a hand history log instead of playing")
+    parser.add_argument('--hand', type=int, default=0, help="hand of the log to start from, counted from 0")
+    parser.add_argument('--history', metavar='LOG', help="append every hand played to this hand history log")
+    parser.add_argument('--columns', metavar='STORE', help="record every action to this columnar store for player stats")
+    parser.add_argument('--profile', action='store_true',
+                        help="start with timing and the frame-time overlay on (toggle with F3; F4 samples stacks)")
+    args = parser.parse_args()
+    game = ReplayGame(args.replay, args.hand, args.profile) if args.replay else PokerGame(args.profile, args.history, args.columns)
     game.run()
     pygame.quit()
-    sys.exit()
\ No newline at end of file
+    sys.exit()
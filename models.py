@@ -1,22 +1,64 @@
-from typing import List, Tuple
+from typing import Iterable, List, Tuple, Union
+
+# Compact card encoding used by the engine: code = suit_index * 13 + value_index,
+# so a code fits in 0..51 and a set of cards fits in a 52-bit mask.
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+VALUES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+CARD_CODES = {(value, suit): s * 13 + v
+              for s, suit in enumerate(SUITS) for v, value in enumerate(VALUES)}
 
 class Card:
     def __init__(self, suit: str, value: str):
         self.suit = suit
         self.value = value
+        self.code = CARD_CODES[(value, suit)]
         self.face_up = False
         self.image = None
         self.rect = None
 
+    @classmethod
+    def from_code(cls, code: int) -> 'Card':
+        """Create a displayable card from its compact code"""
+        return cls(SUITS[code // 13], VALUES[code % 13])
+
     def __str__(self):
         return f"{self.value} of {self.suit}"
 
+def to_codes(cards: Iterable[Union[Card, int]]) -> List[int]:
+    """Convert a mix of Card objects and card codes into card codes"""
+    return [card if isinstance(card, int) else card.code for card in cards]
+
+def codes_to_mask(codes: Iterable[int]) -> int:
+    """Pack card codes into a 52-bit card mask"""
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
+def mask_to_codes(mask: int) -> List[int]:
+    """Unpack a 52-bit card mask into ascending card codes"""
+    codes = []
+    while mask:
+        low = mask & -mask
+        codes.append(low.bit_length() - 1)
+        mask ^= low
+    return codes
+
+def cards_to_mask(cards: Iterable[Card]) -> int:
+    """Pack Card objects into a 52-bit card mask"""
+    return codes_to_mask(card.code for card in cards)
+
+def mask_to_cards(mask: int) -> List[Card]:
+    """Create Card objects for every card in a 52-bit card mask"""
+    return [Card.from_code(code) for code in mask_to_codes(mask)]
+
 class Player:
-    def __init__(self, name: str, position: Tuple[int, int]):
+    def __init__(self, name: str, position: Tuple[int, int], chips: int = 1000):
         self.name = name
         self.position = position
         self.hand: List[Card] = []
-        self.chips = 1000
+        self.hole: List[int] = []  # Card codes of the hand, used by the engine
+        self.chips = chips
         self.bet = 0
         self.folded = False
-        self.is_all_in = False 
\ No newline at end of file
+        self.is_all_in = False 
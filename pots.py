@@ -0,0 +1,71 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+class Pot:
+    def __init__(self, amount: int, eligible: List[int]):
+        self.amount = amount
+        self.eligible = eligible  # Seats that can win this pot, smallest contribution first
+
+    def __repr__(self):
+        return f"Pot({self.amount}, eligible={self.eligible})"
+
+class PotManager:
+    def __init__(self, seats: int):
+        self.contributions = [0] * seats  # Chips each seat has put in this hand
+
+    def reset(self, seats: Optional[int] = None):
+        """Clear the contributions, resizing for a new seat count if given"""
+        self.contributions = [0] * (len(self.contributions) if seats is None else seats)
+
+    def add(self, seat: int, amount: int):
+        self.contributions[seat] += amount
+
+    @property
+    def total(self) -> int:
+        return sum(self.contributions)
+
+    def build_pots(self, folded: Sequence[bool]) -> List[Pot]:
+        """
+        Split the contributions into a main pot and side pots.
+        Seats are sorted by contribution once; each distinct level caps a pot that
+        every seat contributing at least that much pays into, and that only the
+        players still in the hand at that level can win.
+        """
+        order = sorted(range(len(self.contributions)), key=self.contributions.__getitem__)
+        # Players still in the hand, lowest contribution first; those from `live` on reach the current level
+        contenders = [seat for seat in order if not folded[seat] and self.contributions[seat] > 0]
+        live = 0
+        pots: List[Pot] = []
+        pot_live = -1
+        previous = 0
+        for i, seat in enumerate(order):
+            level = self.contributions[seat]
+            if level > previous:
+                amount = (level - previous) * (len(order) - i)
+                if pots and (pot_live == live or live == len(contenders)):
+                    # Levels set by folded players do not change who can win, so keep one pot
+                    pots[-1].amount += amount
+                else:
+                    pots.append(Pot(amount, contenders[live:]))
+                    pot_live = live
+                previous = level
+            if live < len(contenders) and contenders[live] == seat:
+                live += 1
+        return pots
+
+    def award(self, strengths: Dict[int, int], folded: Sequence[bool],
+              dealer: int) -> List[Tuple[Pot, List[Tuple[int, int]]]]:
+        """
+        Award every pot to the strongest eligible hands, returning each pot with its (seat, chips) shares.
+        `strengths` holds one strength per seat still in the hand. Odd chips of a
+        split pot go one at a time to the winners closest to the dealer's left.
+        """
+        results = []
+        seats = len(self.contributions)
+        for pot in self.build_pots(folded):
+            best = max(strengths[seat] for seat in pot.eligible)
+            winners = [seat for seat in pot.eligible if strengths[seat] == best]
+            winners.sort(key=lambda seat: (seat - dealer - 1) % seats)
+            share, odd_chips = divmod(pot.amount, len(winners))
+            results.append((pot, [(seat, share + (1 if i < odd_chips else 0)) for i, seat in enumerate(winners)]))
+        self.reset()
+        return results
@@ -0,0 +1,157 @@
+import argparse
+import os
+import struct
+import time
+from typing import Optional, Sequence, Union
+import numpy as np
+from models import Card, to_codes
+from combos import (CLASS_COMBOS, COMBO_CARDS, COMBO_CLASS, COMBO_INDEX, COMBO_MASKS, COMBOS,
+                    HAND_CLASSES, suit_permutation)
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_equity.bin')
+MAX_OPPONENTS = 9
+
+# File layout: a 64-byte header followed by two little-endian float32 arrays,
+#   multiway[169, 9]      equity of each canonical hand against 1..9 random hands
+#   heads_up[1326, 1326]  equity of combo i against combo j (NaN when they share a card)
+_MAGIC = b'PFEQ'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHHH')
+_MULTIWAY_OFFSET = 64
+_HEADS_UP_OFFSET = _MULTIWAY_OFFSET + len(HAND_CLASSES) * MAX_OPPONENTS * 4
+
+# Boards scored per vectorized step of the heads-up build
+_BOARD_BATCH = 32
+
+
+def build_multiway(trials: int, rng: np.random.Generator) -> np.ndarray:
+    """Monte Carlo equity of every canonical hand against 1..9 random opponents"""
+    # The evaluator is only needed to build tables, so readers never pay for its setup
+    from equity import draw_without_replacement
+    from game_logic import PokerHand
+    table = np.zeros((len(HAND_CLASSES), MAX_OPPONENTS), dtype=np.float32)
+    for hand_class, combo in enumerate(CLASS_COMBOS):
+        hero = COMBO_CARDS[combo]
+        live = np.setdiff1d(np.arange(52), hero)
+        for opponents in range(1, MAX_OPPONENTS + 1):
+            # Picks come back sorted, so shuffle each row before splitting it into board and hands
+            cards = live[draw_without_replacement(rng, len(live), 5 + 2 * opponents, trials)]
+            cards = rng.permuted(cards, axis=1)
+            board = cards[:, :5]
+            hero_strength = PokerHand.evaluate_batch(np.broadcast_to(hero, (trials, 2)), board)
+            villains = np.stack([PokerHand.evaluate_batch(cards[:, 5 + 2 * seat:7 + 2 * seat], board)
+                                 for seat in range(opponents)])
+            best = villains.max(axis=0)
+            tied = (villains == hero_strength).sum(axis=0)
+            share = np.where(hero_strength > best, 1.0,
+                             np.where(hero_strength == best, 1.0 / (tied + 1), 0.0))
+            table[hand_class, opponents - 1] = share.mean()
+    return table
+
+
+def build_heads_up(boards: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Equity of every combo against every other combo, estimated over random boards.
+    Only one representative combo per canonical class is simulated; the other
+    rows are filled in by relabelling suits.
+    """
+    from equity import draw_without_replacement
+    from game_logic import PokerHand
+    heroes = np.array(CLASS_COMBOS)
+    wins = np.zeros((len(heroes), len(COMBOS)), dtype=np.int64)
+    ties = np.zeros_like(wins)
+    seen = np.zeros_like(wins)
+    all_holes = np.tile(COMBO_CARDS, (_BOARD_BATCH, 1))
+    for start in range(0, boards, _BOARD_BATCH):
+        size = min(_BOARD_BATCH, boards - start)
+        board = draw_without_replacement(rng, 52, 5, size)
+        board_masks = (np.int64(1) << board).sum(axis=1)
+
+        # Strength of every combo that does not touch the board, on every board
+        live = (COMBO_MASKS[None, :] & board_masks[:, None]) == 0
+        rows = np.flatnonzero(live)
+        strengths = np.zeros((size, len(COMBOS)), dtype=np.int32)
+        strengths.ravel()[rows] = PokerHand.evaluate_batch(all_holes[rows],
+                                                           board[rows // len(COMBOS)])
+        hero_strengths = strengths[:, heroes][:, :, None]
+        valid = live[:, heroes][:, :, None] & live[:, None, :]
+        villain_strengths = strengths[:, None, :]
+        wins += ((hero_strengths > villain_strengths) & valid).sum(axis=0)
+        ties += ((hero_strengths == villain_strengths) & valid).sum(axis=0)
+        seen += valid.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        class_equity = (wins + 0.5 * ties) / seen
+    overlapping = (COMBO_MASKS[heroes][:, None] & COMBO_MASKS[None, :]) != 0
+    class_equity[overlapping] = np.nan
+
+    # Row h of the full table is its class row read through h's suit relabelling
+    table = np.empty((len(COMBOS), len(COMBOS)), dtype=np.float32)
+    for combo in range(len(COMBOS)):
+        hand_class = COMBO_CLASS[combo]
+        permutation = np.array(suit_permutation(combo, CLASS_COMBOS[hand_class]))
+        mapped = permutation[COMBO_CARDS]
+        columns = [COMBO_INDEX[a][b] for a, b in mapped.tolist()]
+        table[combo] = class_equity[hand_class, columns]
+
+    # Both directions of a matchup were estimated separately; make them sum to one
+    return (table + (1.0 - table.T)) / 2
+
+
+def build_tables(path: str = DEFAULT_TABLE_PATH, trials: int = 20_000, boards: int = 20_000,
+                 seed: Optional[int] = None):
+    """Compute both preflop tables and write them to `path`"""
+    rng = np.random.default_rng(seed)
+    multiway = build_multiway(trials, rng)
+    heads_up = build_heads_up(boards, rng)
+    header = _HEADER.pack(_MAGIC, _VERSION, len(HAND_CLASSES), MAX_OPPONENTS, len(COMBOS))
+    with open(path + '.tmp', 'wb') as file:
+        file.write(header.ljust(_MULTIWAY_OFFSET, b'\0'))
+        file.write(multiway.astype('<f4').tobytes())
+        file.write(heads_up.astype('<f4').tobytes())
+    os.replace(path + '.tmp', path)
+
+
+class PreflopTable:
+    def __init__(self, path: str = DEFAULT_TABLE_PATH):
+        """Map a table file built by build_tables; pages are only read when looked up"""
+        with open(path, 'rb') as file:
+            magic, version, classes, opponents, combos = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a preflop equity table")
+        if (classes, opponents, combos) != (len(HAND_CLASSES), MAX_OPPONENTS, len(COMBOS)):
+            raise ValueError(f"{path} has an unexpected table layout")
+        self.multiway = np.memmap(path, dtype='<f4', mode='r', offset=_MULTIWAY_OFFSET,
+                                  shape=(len(HAND_CLASSES), MAX_OPPONENTS))
+        self.heads_up = np.memmap(path, dtype='<f4', mode='r', offset=_HEADS_UP_OFFSET,
+                                  shape=(len(COMBOS), len(COMBOS)))
+
+    def vs_random(self, hole_cards: Sequence[Union[Card, int]], opponents: int = 1) -> float:
+        """Equity of a starting hand against 1..9 random opponents"""
+        if not 1 <= opponents <= MAX_OPPONENTS:
+            raise ValueError(f"Opponents must be between 1 and {MAX_OPPONENTS}")
+        first, second = to_codes(hole_cards)
+        return float(self.multiway[COMBO_CLASS[COMBO_INDEX[first][second]], opponents - 1])
+
+    def vs_hand(self, hole_cards: Sequence[Union[Card, int]], other_cards: Sequence[Union[Card, int]]) -> float:
+        """Heads-up equity of one starting hand against another"""
+        first, second = to_codes(hole_cards)
+        third, fourth = to_codes(other_cards)
+        equity = float(self.heads_up[COMBO_INDEX[first][second], COMBO_INDEX[third][fourth]])
+        if equity != equity:
+            raise ValueError("The two hands share a card")
+        return equity
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the preflop equity tables")
+    parser.add_argument('--output', default=DEFAULT_TABLE_PATH)
+    parser.add_argument('--trials', type=int, default=20_000,
+                        help="run-outs per hand class and opponent count")
+    parser.add_argument('--boards', type=int, default=20_000,
+                        help="random boards scored for the heads-up table")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    build_tables(args.output, args.trials, args.boards, args.seed)
+    print(f"Wrote {args.output} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,171 @@
+import functools
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from engine import TableEngine
+from evaluator import BoardEvaluator
+from game_logic import PokerHand
+
+# Durations fall into power-of-two nanosecond buckets: bucket b holds [2**(b-1), 2**b)
+BUCKETS = 40
+
+class Timing:
+    def __init__(self):
+        """Call count, total time and a histogram of one instrumented operation"""
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, duration_ns: int):
+        self.count += 1
+        self.total_ns += duration_ns
+        self.buckets[min(duration_ns.bit_length(), BUCKETS - 1)] += 1
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile_ns(self, fraction: float) -> int:
+        """Upper edge of the bucket holding the given fraction of calls"""
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return 1 << bucket
+        return 0
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'total_ns': self.total_ns, 'mean_ns': self.mean_ns,
+                'p50_ns': self.percentile_ns(0.5), 'p90_ns': self.percentile_ns(0.9),
+                'p99_ns': self.percentile_ns(0.99), 'buckets': self.buckets}
+
+class Timings:
+    def __init__(self):
+        self.timings: Dict[str, Timing] = {}
+
+    def add(self, name: str, duration_ns: int):
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        timing.add(duration_ns)
+
+    def __getitem__(self, name: str) -> Timing:
+        return self.timings[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.timings
+
+    def clear(self):
+        self.timings.clear()
+
+    def export(self, path: str):
+        """Write every histogram as JSON"""
+        with open(path, 'w') as file:
+            json.dump({name: timing.to_dict() for name, timing in sorted(self.timings.items())}, file, indent=2)
+
+    def summary(self) -> str:
+        lines = [f"{'operation':<40} {'calls':>10} {'mean':>10} {'p99':>10} {'total':>10}"]
+        for name, timing in sorted(self.timings.items(), key=lambda item: -item[1].total_ns):
+            lines.append(f"{name:<40} {timing.count:>10} {timing.mean_ns / 1000:>8.1f}us "
+                         f"{timing.percentile_ns(0.99) / 1000:>8.1f}us {timing.total_ns / 1e9:>9.3f}s")
+        return "\n".join(lines)
+
+# The engine hot paths, as (owner, attribute) pairs
+HOT_PATHS: List[Tuple[type, str]] = [
+    (PokerHand, 'evaluate_hand'),
+    (PokerHand, 'evaluate_codes'),
+    (BoardEvaluator, 'evaluate'),
+    (TableEngine, 'act'),
+    (TableEngine, 'start_new_hand'),
+    (TableEngine, 'next_player'),
+    (TableEngine, 'is_betting_round_complete'),
+    (TableEngine, 'showdown'),
+]
+
+timings = Timings()
+_originals: Dict[Tuple[type, str], object] = {}
+
+def _timed(function: Callable, name: str) -> Callable:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings.add(name, time.perf_counter_ns() - started)
+    return wrapper
+
+def enable(targets: List[Tuple[type, str]] = HOT_PATHS):
+    """
+    Wrap the targets in timers. Nothing is patched until this is called, so the
+    hot paths cost nothing extra while profiling is off.
+    """
+    for owner, attribute in targets:
+        if (owner, attribute) in _originals:
+            continue
+        original = owner.__dict__[attribute]
+        name = f"{owner.__name__}.{attribute}"
+        if isinstance(original, staticmethod):
+            wrapped = staticmethod(_timed(original.__func__, name))
+        else:
+            wrapped = _timed(original, name)
+        _originals[(owner, attribute)] = original
+        setattr(owner, attribute, wrapped)
+
+def disable():
+    """Put the original functions back"""
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+class Sampler:
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        """
+        Sampling profiler: a background thread records the stack of one thread
+        (the one that created the sampler by default) every `interval` seconds.
+        """
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        """Write the samples as collapsed stacks, the input format of flamegraph.pl and speedscope"""
+        with open(path, 'w') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
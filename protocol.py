@@ -0,0 +1,105 @@
+import struct
+from typing import List, Sequence, Tuple
+from engine import (BLIND, BOARD, CALL, CHECK, FOLD, GAME_OVER, HAND_END, HAND_START, HOLE_CARDS, POT,
+                    RAISE, WIN)
+
+# Every message is a frame: payload length (u16) then the payload, whose first
+# byte is the message type. Integers are little-endian.
+#
+# Client to server
+#   JOIN    name (utf-8)                       take a seat at any table with room
+#   ACT     kind (u8), amount (u32)            act in turn; amount is the raise-to total
+# Server to client
+#   SEATED  table (u32), seat (u8)
+#   EVENT   kind (u8), seat (u8), amount (u32), card count (u8), cards (u8 each)
+#   TURN    seat (u8), to call (u32), min raise (u32), max raise (u32)
+#   ERROR   message (utf-8)
+JOIN = 1
+ACT = 2
+SEATED = 1
+EVENT = 2
+TURN = 3
+ERROR = 4
+
+NO_SEAT = 255
+ACTION_KINDS = [FOLD, CHECK, CALL, RAISE]
+ACTION_CODES = {kind: code for code, kind in enumerate(ACTION_KINDS)}
+EVENT_KINDS = [HAND_START, HOLE_CARDS, BLIND, FOLD, CHECK, CALL, RAISE, BOARD, POT, WIN, HAND_END, GAME_OVER]
+EVENT_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+
+_LENGTH = struct.Struct('<H')
+# Fixed-size payloads, and the same payloads packed together with their frame header in one call
+_ACT_BODY = struct.Struct('<BBI')
+_SEATED_BODY = struct.Struct('<BIB')
+_EVENT_BODY = struct.Struct('<BBBIB')
+_TURN_BODY = struct.Struct('<BBIII')
+_ACT = struct.Struct('<H' + _ACT_BODY.format[1:])
+_SEATED = struct.Struct('<H' + _SEATED_BODY.format[1:])
+_EVENT = struct.Struct('<H' + _EVENT_BODY.format[1:])
+_TURN = struct.Struct('<H' + _TURN_BODY.format[1:])
+
+def encode_join(name: str) -> bytes:
+    payload = bytes((JOIN,)) + name.encode()[:200]
+    return _LENGTH.pack(len(payload)) + payload
+
+def encode_act(kind: str, amount: int = 0) -> bytes:
+    return _ACT.pack(_ACT.size - 2, ACT, ACTION_CODES[kind], amount)
+
+def encode_seated(table: int, seat: int) -> bytes:
+    return _SEATED.pack(_SEATED.size - 2, SEATED, table, seat)
+
+def encode_event(kind: str, seat: int, amount: int, cards: Sequence[int] = ()) -> bytes:
+    header = _EVENT.pack(_EVENT.size - 2 + len(cards), EVENT, EVENT_CODES[kind],
+                         seat if seat >= 0 else NO_SEAT, amount, len(cards))
+    return header + bytes(cards) if cards else header
+
+def encode_turn(seat: int, to_call: int, min_raise: int, max_raise: int) -> bytes:
+    return _TURN.pack(_TURN.size - 2, TURN, seat, to_call, min_raise, max_raise)
+
+def encode_error(message: str) -> bytes:
+    payload = bytes((ERROR,)) + message.encode()
+    return _LENGTH.pack(len(payload)) + payload
+
+def decode_act(payload: bytes) -> Tuple[str, int]:
+    """(kind, amount), raising ValueError for a frame a client got wrong"""
+    if len(payload) != _ACT_BODY.size:
+        raise ValueError("Malformed action")
+    _, code, amount = _ACT_BODY.unpack(payload)
+    if code >= len(ACTION_KINDS):
+        raise ValueError("Unknown action")
+    return ACTION_KINDS[code], amount
+
+def decode_seated(payload: bytes) -> Tuple[int, int]:
+    _, table, seat = _SEATED_BODY.unpack_from(payload)
+    return table, seat
+
+def decode_event(payload: bytes) -> Tuple[str, int, int, List[int]]:
+    """(kind, seat or -1, amount, cards)"""
+    _, code, seat, amount, count = _EVENT_BODY.unpack_from(payload)
+    return EVENT_KINDS[code], seat if seat != NO_SEAT else -1, amount, list(payload[_EVENT_BODY.size:])
+
+def decode_turn(payload: bytes) -> Tuple[int, int, int, int]:
+    """(seat, to call, min raise, max raise)"""
+    _, seat, to_call, min_raise, max_raise = _TURN_BODY.unpack_from(payload)
+    return seat, to_call, min_raise, max_raise
+
+class FrameReader:
+    def __init__(self):
+        """Split a byte stream into frame payloads, keeping partial frames between reads"""
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer += data
+        payloads = []
+        offset = 0
+        end = len(buffer)
+        while end - offset >= 2:
+            length = buffer[offset] | buffer[offset + 1] << 8
+            if end - offset - 2 < length:
+                break
+            payloads.append(bytes(buffer[offset + 2:offset + 2 + length]))
+            offset += 2 + length
+        if offset:
+            del buffer[:offset]
+        return payloads
@@ -0,0 +1,281 @@
+import argparse
+import re
+import time
+from typing import List, Optional, Sequence, Union
+import numpy as np
+from models import Card, to_codes
+from game_logic import PokerHand
+from combos import COMBO_CARDS, COMBO_CLASS, COMBO_INDEX, COMBO_MASKS, COMBOS, HAND_CLASSES
+
+RANKS = '23456789TJQKA'
+SUIT_LETTERS = 'hdcs'  # In the order of models.SUITS
+_CLASS_BY_NAME = {name: i for i, name in enumerate(HAND_CLASSES)}
+CLASS_MEMBERS: List[List[int]] = [[] for _ in HAND_CLASSES]
+for _combo, _hand_class in enumerate(COMBO_CLASS):
+    CLASS_MEMBERS[_hand_class].append(_combo)
+
+# Run-outs with more missing cards than this are sampled instead of enumerated
+MAX_ENUMERATED_CARDS = 2
+DEFAULT_SAMPLES = 20_000
+# Boards scored per vectorized step
+_BOARD_BATCH = 64
+
+_CARD = re.compile(r'([2-9TJQKA])([hdcs])')
+_COMBO = re.compile(r'([2-9TJQKA][hdcs])([2-9TJQKA][hdcs])$')
+_HAND = re.compile(r'([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$')
+
+
+def parse_cards(text: str) -> List[int]:
+    """Card codes from text such as 'AhKd7c'"""
+    cards = _CARD.findall(text)
+    if ''.join(rank + suit for rank, suit in cards) != text.replace(' ', ''):
+        raise ValueError(f"Cannot read cards from {text!r}")
+    return [SUIT_LETTERS.index(suit) * 13 + RANKS.index(rank) for rank, suit in cards]
+
+
+def _class_names(high: int, low: int, suited: str) -> List[str]:
+    """Names of the hand classes written as two ranks and an optional s/o"""
+    name = RANKS[high] + RANKS[low]
+    if high == low:
+        return [name]
+    return [name + suited] if suited else [name + 's', name + 'o']
+
+
+def _expand_hand(token: str) -> List[str]:
+    """Hand classes named by one token: 'AKs', 'QQ+', 'A2s+', '22-55' or 'K9o-KJo'"""
+    if '-' in token:
+        first, last = (_HAND.match(part) for part in token.split('-'))
+        if not first or not last or first.group(4) or last.group(4) or first.group(3) != last.group(3):
+            raise ValueError(f"Cannot read range {token!r}")
+        a_high, a_low = RANKS.index(first.group(1)), RANKS.index(first.group(2))
+        b_high, b_low = RANKS.index(last.group(1)), RANKS.index(last.group(2))
+        if a_high == a_low and b_high == b_low:
+            return [name for rank in range(min(a_high, b_high), max(a_high, b_high) + 1)
+                    for name in _class_names(rank, rank, '')]
+        if a_high != b_high:
+            raise ValueError(f"Range {token!r} must keep its top card fixed")
+        return [name for low in range(min(a_low, b_low), max(a_low, b_low) + 1)
+                for name in _class_names(a_high, low, first.group(3))]
+
+    match = _HAND.match(token)
+    if not match:
+        raise ValueError(f"Cannot read hand {token!r}")
+    high, low = sorted((RANKS.index(match.group(1)), RANKS.index(match.group(2))), reverse=True)
+    suited, plus = match.group(3), match.group(4)
+    if high == low and suited:
+        raise ValueError(f"Pairs cannot be suited or offsuit: {token!r}")
+    if not plus:
+        return _class_names(high, low, suited)
+    if high == low:
+        return [RANKS[rank] * 2 for rank in range(high, 13)]
+    # A2s+ raises the kicker up to one below the top card
+    return [name for kicker in range(low, high) for name in _class_names(high, kicker, suited)]
+
+
+class Range:
+    def __init__(self, weights: Optional[np.ndarray] = None):
+        """A weight between 0 and 1 for each of the 1326 starting combos"""
+        self.weights = np.zeros(len(COMBOS)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    @classmethod
+    def parse(cls, text: str) -> 'Range':
+        """
+        Read a comma-separated range such as 'QQ+,AKs,A5s-A2s:0.5,AhKh'.
+        A ':weight' suffix includes that part at the given frequency; later parts
+        override earlier ones for the combos they share.
+        """
+        weights = np.zeros(len(COMBOS))
+        for part in text.replace(' ', '').split(','):
+            if not part:
+                continue
+            token, _, weight = part.partition(':')
+            value = float(weight) if weight else 1.0
+            if not 0 <= value <= 1:
+                raise ValueError(f"Weight of {part!r} must be between 0 and 1")
+            if token.lower() in ('random', 'any'):
+                weights[:] = value
+            elif _COMBO.match(token):
+                first, second = parse_cards(token)
+                if first == second:
+                    raise ValueError(f"{token!r} holds the same card twice")
+                weights[COMBO_INDEX[first][second]] = value
+            else:
+                for name in _expand_hand(token):
+                    weights[CLASS_MEMBERS[_CLASS_BY_NAME[name]]] = value
+        return cls(weights)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.weights))
+
+    @property
+    def combos(self) -> float:
+        """Weighted number of combos"""
+        return float(self.weights.sum())
+
+    def without(self, dead: Sequence[Union[Card, int]]) -> 'Range':
+        """A copy without the combos that hold any of the dead cards"""
+        mask = 0
+        for code in to_codes(dead):
+            mask |= 1 << code
+        weights = self.weights.copy()
+        weights[(COMBO_MASKS & np.int64(mask)) != 0] = 0
+        return Range(weights)
+
+    def __repr__(self):
+        return f"Range({len(self)} combos, {self.combos:g} weighted)"
+
+
+class RangeEquity:
+    def __init__(self, equity: float, combo_equity: np.ndarray, matchups: float, boards: int, exact: bool):
+        self.equity = equity  # Share of the pot the first range wins on average
+        self.combo_equity = combo_equity  # Per combo of the first range, NaN outside it
+        self.matchups = matchups  # Weighted (combo, combo, board) triples scored
+        self.boards = boards
+        self.exact = exact
+
+    def class_equity(self, weights: np.ndarray) -> dict:
+        """Equity of each hand class present in the range, weighting its combos by `weights`"""
+        result = {}
+        for hand_class, members in enumerate(CLASS_MEMBERS):
+            equities = self.combo_equity[members]
+            present = ~np.isnan(equities) & (weights[members] > 0)
+            if present.any():
+                result[HAND_CLASSES[hand_class]] = float(np.average(equities[present],
+                                                                    weights=weights[members][present]))
+        return result
+
+    def __str__(self):
+        kind = "exact" if self.exact else f"{self.boards} sampled boards"
+        return f"{self.equity:.2%} vs {1 - self.equity:.2%} ({kind})"
+
+
+def _run_outs(board: List[int], samples: int, rng: np.random.Generator) -> np.ndarray:
+    """Every completion of the board, or `samples` random ones when there are too many"""
+    from equity import draw_without_replacement
+    live = np.setdiff1d(np.arange(52), board)
+    missing = 5 - len(board)
+    if missing == 0:
+        run_outs = np.empty((1, 0), dtype=np.int64)
+    elif missing <= MAX_ENUMERATED_CARDS:
+        picks = np.array(np.triu_indices(len(live), 1)).T if missing == 2 else np.arange(len(live))[:, None]
+        run_outs = live[picks]
+    else:
+        run_outs = live[draw_without_replacement(rng, len(live), missing, samples)]
+    return np.concatenate((np.broadcast_to(np.array(board, dtype=np.int64), (len(run_outs), len(board))),
+                           run_outs), axis=1)
+
+
+def _compare_sums(strengths: np.ndarray, weights: np.ndarray):
+    """
+    For every entry of each row, the total weight of the entries in the same row
+    with a lower strength and with an equal one (itself included).
+    """
+    order = np.argsort(strengths, axis=1, kind='stable')
+    ordered = np.take_along_axis(strengths, order, axis=1)
+    cumulative = np.cumsum(np.take_along_axis(weights, order, axis=1), axis=1)
+    before = np.concatenate((np.zeros((len(ordered), 1)), cumulative[:, :-1]), axis=1)
+    # Positions where a new strength starts, and the last position of each run of equal ones
+    columns = np.arange(ordered.shape[1])
+    starts = np.empty(ordered.shape, dtype=bool)
+    starts[:, 0] = True
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    first = np.maximum.accumulate(np.where(starts, columns, 0), axis=1)
+    ends = np.empty(ordered.shape, dtype=bool)
+    ends[:, -1] = True
+    ends[:, :-1] = starts[:, 1:]
+    last = np.minimum.accumulate(np.where(ends, columns, columns[-1])[:, ::-1], axis=1)[:, ::-1]
+    less_sorted = np.take_along_axis(before, first, axis=1)
+    equal_sorted = np.take_along_axis(cumulative, last, axis=1) - less_sorted
+    less = np.empty_like(less_sorted)
+    equal = np.empty_like(equal_sorted)
+    np.put_along_axis(less, order, less_sorted, axis=1)
+    np.put_along_axis(equal, order, equal_sorted, axis=1)
+    return less, equal
+
+
+def range_vs_range(hero: Range, villain: Range, board: Sequence[Union[Card, int]] = (),
+                   samples: int = DEFAULT_SAMPLES, seed: Optional[int] = None) -> RangeEquity:
+    """
+    Equity of one range against another, weighting every pair of combos that can
+    be dealt together. Each board's strengths are ranked once; sorted prefix sums
+    give every combo's wins and ties against the whole opposing range, and
+    per-card sums take out the opposing combos it blocks.
+    """
+    board = to_codes(board)
+    hero, villain = hero.without(board), villain.without(board)
+    # Only combos in either range are ever evaluated
+    used = np.flatnonzero((hero.weights > 0) | (villain.weights > 0))
+    if not (hero.weights > 0).any() or not (villain.weights > 0).any():
+        raise ValueError("Both ranges need at least one combo that does not touch the board")
+    cards = COMBO_CARDS[used]
+    hero_weights, villain_weights = hero.weights[used], villain.weights[used]
+
+    # Members of `used` holding each card, padded with a slot past the end that never matches
+    members = [np.flatnonzero((cards == card).any(axis=1)) for card in range(52)]
+    width = max(len(indices) for indices in members)
+    card_members = np.full((52, width), len(used))
+    for card, indices in enumerate(members):
+        card_members[card, :len(indices)] = indices
+    # Where each combo sits in its two cards' member lists
+    slots = np.empty((len(used), 2), dtype=np.int64)
+    for card, indices in enumerate(members):
+        for slot, index in enumerate(indices):
+            slots[index, int(cards[index, 1] == card)] = card * width + slot
+
+    boards = _run_outs(board, samples, np.random.default_rng(seed))
+    wins = np.zeros(len(used))
+    matchups = np.zeros(len(used))
+    for start in range(0, len(boards), _BOARD_BATCH):
+        batch = boards[start:start + _BOARD_BATCH]
+        board_masks = (np.int64(1) << batch).sum(axis=1)
+        alive = (COMBO_MASKS[used][None, :] & board_masks[:, None]) == 0
+        rows = np.flatnonzero(alive)
+        strengths = np.full(alive.shape, -1, dtype=np.int64)
+        strengths.ravel()[rows] = PokerHand.evaluate_batch(cards[rows % len(used)], batch[rows // len(used)])
+        weights = villain_weights * alive
+
+        less, equal = _compare_sums(strengths, weights)
+        # The same sums over the combos sharing each card, to remove the villain combos a hand blocks
+        padded_strengths = np.concatenate((strengths, np.full((len(batch), 1), -2)), axis=1)[:, card_members]
+        padded_weights = np.concatenate((weights, np.zeros((len(batch), 1))), axis=1)[:, card_members]
+        card_less, card_equal = _compare_sums(padded_strengths.reshape(-1, width), padded_weights.reshape(-1, width))
+        card_less = card_less.reshape(len(batch), -1)
+        card_equal = card_equal.reshape(len(batch), -1)
+        card_total = padded_weights.sum(axis=2)
+
+        # A combo's own weight was taken out once per card, so add it back once
+        less -= card_less[:, slots[:, 0]] + card_less[:, slots[:, 1]]
+        equal -= card_equal[:, slots[:, 0]] + card_equal[:, slots[:, 1]] - weights
+        total = (weights.sum(axis=1)[:, None] - card_total[:, cards[:, 0]] - card_total[:, cards[:, 1]]
+                 + weights)
+        wins += ((less + 0.5 * equal) * alive).sum(axis=0)
+        matchups += (total * alive).sum(axis=0)
+
+    combo_equity = np.full(len(COMBOS), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        in_range = hero_weights > 0
+        combo_equity[used[in_range]] = wins[in_range] / matchups[in_range]
+    total_matchups = float((hero_weights * matchups).sum())
+    if total_matchups == 0:
+        raise ValueError("The ranges have no combos that can be dealt together")
+    equity = float((hero_weights * wins).sum()) / total_matchups
+    return RangeEquity(equity, combo_equity, total_matchups, len(boards), len(board) >= 5 - MAX_ENUMERATED_CARDS)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Equity of one hand range against another")
+    parser.add_argument('hero', help="range such as 'QQ+,AKs'")
+    parser.add_argument('villain', help="range such as '22+,A2s+'")
+    parser.add_argument('--board', default='', help="board cards such as 'Ah7d2c'")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help="random run-outs when the board is too short to enumerate")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--classes', action='store_true', help="also show the equity of each hand class")
+    args = parser.parse_args()
+    hero, villain = Range.parse(args.hero), Range.parse(args.villain)
+    started = time.perf_counter()
+    result = range_vs_range(hero, villain, parse_cards(args.board), args.samples, args.seed)
+    print(f"{args.hero} vs {args.villain}: {result} in {time.perf_counter() - started:.2f}s")
+    if args.classes:
+        for name, equity in result.class_equity(hero.weights).items():
+            print(f"  {name:<4} {equity:.2%}")
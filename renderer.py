@@ -0,0 +1,84 @@
+import time
+import pygame
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+class Region:
+    def __init__(self, name: str, rect: pygame.Rect, draw: Callable[[], None], state: Callable[[], Hashable]):
+        self.name = name
+        self.rect = rect
+        self.draw = draw  # Paints the region; drawing is clipped to rect
+        self.state = state  # Everything the region's look depends on
+        self.last_state = None
+        self.dirty = True
+
+class Renderer:
+    def __init__(self, screen: pygame.Surface, background: Tuple[int, int, int]):
+        """
+        Retained-mode renderer: the screen is split into named regions and a frame
+        only repaints and pushes the regions whose state changed since the last one.
+        """
+        self.screen = screen
+        self.background = background
+        self.regions: Dict[str, Region] = {}
+        self.full_redraw = True
+        # Set to a profiling.Timings to time each stage of a frame
+        self.timings = None
+
+    def add(self, name: str, rect: pygame.Rect, draw: Callable[[], None], state: Callable[[], Hashable] = tuple):
+        """Register a region; without a state function it is only drawn when invalidated"""
+        self.regions[name] = Region(name, rect, draw, state)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Force one region, or the whole screen, to be repainted on the next frame"""
+        if name is None:
+            self.full_redraw = True
+        else:
+            self.regions[name].dirty = True
+
+    def render(self) -> List[pygame.Rect]:
+        """Repaint the changed regions, push them to the display and return their rects"""
+        timings = self.timings
+        if timings is not None:
+            started = time.perf_counter_ns()
+        dirty = []
+        for region in self.regions.values():
+            state = region.state()
+            if region.dirty or self.full_redraw or state != region.last_state:
+                region.last_state = state
+                region.dirty = False
+                dirty.append(region)
+        if timings is not None:
+            timings.add("render.state", time.perf_counter_ns() - started)
+
+        if self.full_redraw:
+            self.full_redraw = False
+            self.screen.fill(self.background)
+            for region in dirty:
+                self._paint(region)
+            self._present(pygame.display.flip)
+            return [self.screen.get_rect()]
+
+        for region in dirty:
+            self.screen.fill(self.background, region.rect)
+            self._paint(region)
+        rects = [region.rect for region in dirty]
+        if rects:
+            self._present(lambda: pygame.display.update(rects))
+        return rects
+
+    def _paint(self, region: Region):
+        if self.timings is not None:
+            started = time.perf_counter_ns()
+        self.screen.set_clip(region.rect)
+        region.draw()
+        self.screen.set_clip(None)
+        if self.timings is not None:
+            self.timings.add(f"render.{region.name}", time.perf_counter_ns() - started)
+
+    def _present(self, push: Callable[[], None]):
+        if self.timings is None:
+            push()
+            return
+        started = time.perf_counter_ns()
+        push()
+        self.timings.add("render.present", time.perf_counter_ns() - started)
@@ -0,0 +1,190 @@
+import argparse
+import os
+import time
+from typing import List, Optional
+import numpy as np
+from deck import Deck
+from engine import Action, TableEngine, BLIND, CALL, CHECK, FOLD, RAISE, WIN
+from history import HandRecord, read_hand_at, record_offsets, skip_hands
+from models import Player
+
+# Hands between checkpoints in a log's index
+CHECKPOINT_INTERVAL = 256
+ACTIONS = (FOLD, CHECK, CALL, RAISE)
+
+# Index file layout (little-endian u64): log size when indexed, hand count,
+# checkpoint interval, then the offset of every interval-th record
+_INDEX_FIELDS = 3
+
+def index_path(path: str) -> str:
+    return path + '.idx'
+
+def build_index(path: str, interval: int = CHECKPOINT_INTERVAL) -> np.ndarray:
+    """
+    Offsets of every `interval`-th record of a log, kept in a sidecar file.
+    An index left behind by a shorter log is extended from its last checkpoint.
+    """
+    size = os.path.getsize(path)
+    start, hands, checkpoints = None, 0, []
+    if os.path.exists(index_path(path)):
+        index = np.fromfile(index_path(path), dtype='<u8')
+        if len(index) >= _INDEX_FIELDS and int(index[2]) == interval:
+            if int(index[0]) == size:
+                return index
+            if int(index[0]) < size and len(index) > _INDEX_FIELDS:
+                # Rescan only from the last checkpoint of the old index
+                checkpoints = index[_INDEX_FIELDS:-1].tolist()
+                start = int(index[-1])
+                hands = len(checkpoints) * interval
+
+    for offset in record_offsets(path, start):
+        if hands % interval == 0:
+            checkpoints.append(offset)
+        hands += 1
+    index = np.array([size, hands, interval] + checkpoints, dtype='<u8')
+    index.tofile(index_path(path))
+    return index
+
+def stacked_deck(record: HandRecord) -> List[int]:
+    """A deck that deals the recorded hole cards and board in the engine's dealing order"""
+    order = [hole[card] for card in range(2) for _, hole in record.seats if len(hole) > card]
+    order += record.board
+    rest = [code for code in range(52) if code not in set(order)]
+    return rest + order[::-1]
+
+class Replayer:
+    def __init__(self, path: str, engine: Optional[TableEngine] = None, interval: int = CHECKPOINT_INTERVAL):
+        """
+        Replay a hand history log through a TableEngine. Any hand can be reached
+        by jumping to the nearest checkpoint and skipping at most interval - 1
+        records, since every record holds the stacks it started from.
+        """
+        self.path = path
+        self.index = build_index(path, interval)
+        self.interval = int(self.index[2])
+        self.engine = engine or TableEngine([])
+        self.engine.auto_start = False
+        self.file = open(path, 'rb')
+        self.hand_index = -1
+        self.next_offset = 0  # Offset of the record after the current one
+        self.record: Optional[HandRecord] = None
+        self.actions: List = []
+        self.step_index = 0
+
+    def __len__(self):
+        return int(self.index[1])
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def seek(self, hand: int):
+        """Set the table up at the start of hand `hand` (counted from 0)"""
+        if not 0 <= hand < len(self):
+            raise IndexError(f"Hand {hand} is out of range; the log has {len(self)} hands")
+        checkpoint = int(self.index[_INDEX_FIELDS + hand // self.interval])
+        offset = skip_hands(self.file, checkpoint, hand % self.interval)
+        record, self.next_offset = read_hand_at(self.file, offset)
+        self.hand_index = hand
+        self.load(record)
+
+    def load(self, record: HandRecord):
+        """Seat the recorded stacks, set the recorded blinds and deal the recorded cards"""
+        engine = self.engine
+        players = engine.players
+        while len(players) < len(record.seats):
+            players.append(Player(f"Seat {len(players) + 1}", (0, 0)))
+        del players[len(record.seats):]
+        for player, (chips, _) in zip(players, record.seats):
+            player.chips = chips
+        engine.dealer = record.dealer
+        engine.small_blind, engine.big_blind, engine.ante = record.blinds
+        if engine.shuffler.seed != record.seed:
+            # Hands dealt after the log ends carry on from the same deck
+            engine.shuffler = Deck(record.seed)
+        engine.hand_number = record.hand_number - 1
+        self.record = record
+        self.actions = [event for event in record.events if event.kind in ACTIONS]
+        self.step_index = 0
+        engine.start_new_hand(stacked_deck(record))
+        if self.hand_over:
+            self.check_result()  # Blinds alone put everyone all-in
+
+    @property
+    def hand_over(self) -> bool:
+        return self.step_index >= len(self.actions)
+
+    def step(self) -> bool:
+        """Apply the next recorded action; returns False once the hand is over"""
+        if self.hand_over:
+            return False
+        event = self.actions[self.step_index]
+        engine = self.engine
+        if engine.current_player != event.seat or engine.game_phase == "showdown":
+            raise ValueError(f"Hand {self.record.hand_number} diverged from the log at action {self.step_index}")
+        amount = 0
+        if event.kind == RAISE:
+            # Logs hold the chips put in; the engine takes the total to raise to
+            amount = engine.players[event.seat].bet + event.amount
+        engine.act(Action(event.kind, amount))
+        self.step_index += 1
+        if self.hand_over:
+            self.check_result()
+        return not self.hand_over
+
+    def check_result(self):
+        """Make sure the replayed stacks match the ones the log implies"""
+        expected = [chips for chips, _ in self.record.seats]
+        for event in self.record.events:
+            if event.kind in (BLIND, CALL, RAISE):
+                expected[event.seat] -= event.amount
+            elif event.kind == WIN:
+                expected[event.seat] += event.amount
+        if [player.chips for player in self.engine.players] != expected:
+            raise ValueError(f"Hand {self.record.hand_number} ended with different stacks than the log")
+
+    def play_hand(self):
+        while self.step():
+            pass
+
+    def next_hand(self) -> bool:
+        """Move to the start of the following hand; returns False at the end of the log"""
+        if self.hand_index + 1 >= len(self):
+            return False
+        if self.record is None:
+            self.seek(0)
+        else:
+            # Read on from the current record instead of going through the index
+            record, self.next_offset = read_hand_at(self.file, self.next_offset)
+            self.hand_index += 1
+            self.load(record)
+        return True
+
+    def run(self, start: int = 0, stop: Optional[int] = None) -> int:
+        """Replay hands start..stop-1 headless at full speed, returning how many were played"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        offset = skip_hands(self.file, int(self.index[_INDEX_FIELDS + start // self.interval]),
+                            start % self.interval)
+        for hand in range(start, stop):
+            record, offset = read_hand_at(self.file, offset)
+            self.hand_index, self.next_offset = hand, offset
+            self.load(record)
+            self.play_hand()
+        return max(stop - start, 0)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a hand history log headless and check it")
+    parser.add_argument('path')
+    parser.add_argument('--start', type=int, default=0, help="first hand to replay, counted from 0")
+    parser.add_argument('--stop', type=int)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    with Replayer(args.path) as replayer:
+        hands = replayer.run(args.start, args.stop)
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {hands} hands in {elapsed:.2f}s ({hands / max(elapsed, 1e-9):.0f} hands/s)")
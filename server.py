@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import resource
+import signal
+from typing import Dict, List, Optional
+from columns import ColumnRecorder, ColumnWriter
+from engine import Action, Event, TableEngine, CHECK, FOLD, HOLE_CARDS
+from history import HandRecorder, HistoryWriter
+from models import Player
+import protocol
+
+STARTING_CHIPS = 1000
+# Seconds a player has to act before they are checked or folded
+ACTION_TIMEOUT = 15.0
+# Seconds between the end of one hand and the start of the next
+HAND_DELAY = 1.0
+# Connections whose unsent output grows past this are too slow to keep up and are dropped
+MAX_WRITE_BUFFER = 1 << 20
+
+class Connection(asyncio.Protocol):
+    def __init__(self, server: 'TableServer'):
+        self.server = server
+        self.transport: Optional[asyncio.Transport] = None
+        self.reader = protocol.FrameReader()
+        self.outgoing = bytearray()  # Messages gathered while handling one action
+        self.player: Optional[Player] = None
+        self.table: Optional['ServerTable'] = None
+        self.seat = -1
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        for payload in self.reader.feed(data):
+            # Frames come from untrusted clients; anything malformed gets an error reply
+            message = payload[0] if payload else None
+            if message == protocol.ACT and self.table:
+                try:
+                    kind, amount = protocol.decode_act(payload)
+                except ValueError as error:
+                    self.send(protocol.encode_error(str(error)))
+                    self.flush()
+                    continue
+                self.table.handle_action(self, kind, amount)
+            elif message == protocol.JOIN and not self.table:
+                self.server.seat(self, payload[1:].decode(errors='replace'))
+            else:
+                self.send(protocol.encode_error("Unexpected message"))
+                self.flush()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.transport = None
+        if self.table:
+            self.table.leave(self)
+
+    def send(self, message: bytes):
+        self.outgoing += message
+
+    def flush(self):
+        """Write everything gathered since the last flush in one call"""
+        if not self.outgoing:
+            return
+        if self.transport and not self.transport.is_closing():
+            if self.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                self.transport.abort()
+            else:
+                self.transport.write(bytes(self.outgoing))
+        self.outgoing.clear()
+
+class ServerTable:
+    def __init__(self, table_id: int, size: int, server: 'TableServer'):
+        self.table_id = table_id
+        self.server = server
+        self.seats: List[Optional[Connection]] = [None] * size
+        self.order: List[int] = []  # Table seat of each engine player in the current hand
+        self.engine = TableEngine([], auto_start=False)
+        self.engine.game_phase = "showdown"
+        self.engine.add_listener(self.on_event)
+        # Each table logs its hands to its own numbered file and columnar store
+        self.history = (HistoryWriter(f"{server.history}.{table_id:04d}", flush_hands=1)
+                        if server.history else None)
+        if self.history:
+            HandRecorder(self.engine, self.history)
+        self.columns = ColumnWriter(f"{server.columns}.{table_id:04d}") if server.columns else None
+        if self.columns:
+            ColumnRecorder(self.engine, self.columns)
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.next_hand: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def open_seats(self) -> int:
+        return self.seats.count(None)
+
+    def join(self, connection: Connection, seat: int):
+        self.seats[seat] = connection
+        connection.table = self
+        connection.seat = seat
+        connection.player = Player(f"Seat {seat + 1}", (0, 0))
+        connection.player.chips = STARTING_CHIPS
+        connection.send(protocol.encode_seated(self.table_id, seat))
+        connection.flush()
+        if not self.in_hand:
+            self.schedule_hand()
+
+    def leave(self, connection: Connection):
+        """Free a seat; a player who leaves mid-hand folds when their turn comes"""
+        if not self.in_hand:
+            self.seats[connection.seat] = None
+            self.server.release(self)
+        elif self.order[self.engine.current_player] == connection.seat:
+            self.apply(Action(FOLD))
+
+    @property
+    def in_hand(self) -> bool:
+        return self.engine.game_phase not in ("showdown", "game_over")
+
+    def schedule_hand(self):
+        if self.next_hand is None:
+            self.next_hand = asyncio.get_running_loop().call_later(self.server.hand_delay, self.start_hand)
+
+    def start_hand(self):
+        self.next_hand = None
+        # Seats whose connection dropped are freed between hands
+        for seat, connection in enumerate(self.seats):
+            if connection and connection.transport is None:
+                self.seats[seat] = None
+                self.server.release(self)
+        self.order = [seat for seat, connection in enumerate(self.seats) if connection]
+        if len(self.order) < 2:
+            return
+        players = []
+        for seat in self.order:
+            player = self.seats[seat].player
+            # Cash game: anyone who cannot cover the big blind buys back in
+            if player.chips < self.engine.big_blind:
+                player.chips = STARTING_CHIPS
+            players.append(player)
+        self.engine.players = players
+        self.engine.dealer %= len(players)
+        self.engine.start_new_hand()
+        self.after_action()
+
+    def on_event(self, event: Event):
+        """Broadcast an engine event, showing hole cards only to their owner"""
+        seat = self.order[event.seat] if event.seat >= 0 else -1
+        message = protocol.encode_event(event.kind, seat, event.amount, event.cards)
+        if event.kind == HOLE_CARDS:
+            hidden = protocol.encode_event(HOLE_CARDS, seat, 0)
+            for connection in self.seats:
+                if connection:
+                    connection.send(message if connection.seat == seat else hidden)
+        else:
+            for connection in self.seats:
+                if connection:
+                    connection.send(message)
+
+    def handle_action(self, connection: Connection, kind: str, amount: int):
+        if not self.in_hand or self.order[self.engine.current_player] != connection.seat:
+            connection.send(protocol.encode_error("Not your turn"))
+            connection.flush()
+            return
+        self.apply(Action(kind, amount))
+
+    def apply(self, action: Action):
+        """Act for the current player, then push the results to every seat"""
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        self.engine.act(action)
+        self.after_action()
+
+    def after_action(self):
+        engine = self.engine
+        if self.in_hand:
+            seat = self.order[engine.current_player]
+            connection = self.seats[seat]
+            if connection.transport is None:
+                # Absent players fold straight away
+                self.apply(Action(FOLD))
+                return
+            player = engine.players[engine.current_player]
+            min_raise, max_raise = engine.raise_bounds()
+            turn = protocol.encode_turn(seat, engine.current_bet - player.bet, min_raise, max_raise)
+            for other in self.seats:
+                if other:
+                    other.send(turn)
+            self.timer = asyncio.get_running_loop().call_later(self.server.action_timeout, self.time_out)
+        else:
+            self.schedule_hand()
+        for connection in self.seats:
+            if connection:
+                connection.flush()
+
+    def time_out(self):
+        """Check for a player who ran out of time, or fold if they face a bet"""
+        self.timer = None
+        player = self.engine.players[self.engine.current_player]
+        self.apply(Action(CHECK if player.bet == self.engine.current_bet else FOLD))
+
+class TableServer:
+    def __init__(self, table_size: int = 6, action_timeout: float = ACTION_TIMEOUT, hand_delay: float = HAND_DELAY,
+                 history: Optional[str] = None, columns: Optional[str] = None):
+        self.table_size = table_size
+        self.action_timeout = action_timeout
+        self.hand_delay = hand_delay
+        self.history = history  # Prefix of the per-table hand history logs
+        self.columns = columns  # Prefix of the per-table columnar stores
+        self.tables: List[ServerTable] = []
+        self.open_tables: Dict[int, ServerTable] = {}  # Tables with at least one free seat
+
+    def seat(self, connection: Connection, name: str):
+        """Seat a new player at the first table with room, opening a table if all are full"""
+        if self.open_tables:
+            table = next(iter(self.open_tables.values()))
+        else:
+            table = ServerTable(len(self.tables), self.table_size, self)
+            self.tables.append(table)
+            self.open_tables[table.table_id] = table
+        table.join(connection, table.seats.index(None))
+        if not table.open_seats:
+            del self.open_tables[table.table_id]
+        connection.player.name = name or connection.player.name
+
+    def release(self, table: ServerTable):
+        """Note that a table has a free seat again"""
+        self.open_tables[table.table_id] = table
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765):
+        """Serve until SIGTERM or SIGINT, then write out every table's logs"""
+        loop = asyncio.get_running_loop()
+        stopped = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stopped.set)
+        server = await loop.create_server(lambda: Connection(self), host, port, backlog=4096)
+        try:
+            async with server:
+                await stopped.wait()
+        finally:
+            self.close()
+
+    def close(self):
+        """Write out every table's queued hand history and columns"""
+        for table in self.tables:
+            if table.history:
+                table.history.close()
+            if table.columns:
+                table.columns.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Host poker tables over TCP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--table-size', type=int, default=6)
+    parser.add_argument('--action-timeout', type=float, default=ACTION_TIMEOUT)
+    parser.add_argument('--hand-delay', type=float, default=HAND_DELAY)
+    parser.add_argument('--history', help="log every table's hands to numbered files with this prefix")
+    parser.add_argument('--columns', help="record every table's actions to numbered columnar stores with this prefix")
+    args = parser.parse_args()
+    # Every seat holds a socket; raise the open file limit as far as allowed
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    try:
+        asyncio.run(TableServer(args.table_size, args.action_timeout, args.hand_delay, args.history, args.columns).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
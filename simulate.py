@@ -0,0 +1,201 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from columns import ColumnRecorder, ColumnWriter
+from engine import Action, TableEngine, CALL, FOLD, RAISE
+from evaluator import HAND_RANK_SHIFT
+from game_logic import PokerHand
+from history import HandRecorder, HistoryWriter
+from models import Player
+
+STARTING_CHIPS = 1000
+# Tables handed to a worker process at a time
+TABLES_PER_TASK = 25
+
+Policy = Callable[[TableEngine, int, random.Random], Action]
+
+def random_policy(engine: TableEngine, seat: int, rng: random.Random) -> Action:
+    """Folds, calls and raises at random"""
+    roll = rng.random()
+    if roll < 0.1:
+        return Action(FOLD)
+    if roll < 0.7:
+        return Action(CALL)
+    min_raise, max_raise = engine.raise_bounds()
+    return Action(RAISE, rng.randint(min_raise, max_raise))
+
+def calling_station(engine: TableEngine, seat: int, rng: random.Random) -> Action:
+    """Never folds and never raises"""
+    return Action(CALL)
+
+def tight_aggressive(engine: TableEngine, seat: int, rng: random.Random) -> Action:
+    """Plays strong starting hands and made hands, raising with the best of them"""
+    player = engine.players[seat]
+    to_call = engine.current_bet - player.bet
+    if not engine.board:
+        # Preflop: pairs, two broadway cards and suited aces are playable, big ones raise
+        high, low = sorted(code % 13 for code in player.hole)[::-1]
+        suited = player.hole[0] // 13 == player.hole[1] // 13
+        playable = high == low or low >= 8 or (high == 12 and suited)
+        hand_rank = 2 if playable and low >= 10 else 1 if playable else 0
+    else:
+        # Postflop: raise with two pair or better, call with a pair
+        hand_rank = min(PokerHand.evaluate_codes(player.hole + engine.board) >> HAND_RANK_SHIFT, 2)
+    if hand_rank == 2:
+        min_raise, _ = engine.raise_bounds()
+        return Action(RAISE, max(min_raise, engine.pot))
+    if hand_rank == 1 or to_call == 0:
+        return Action(CALL)
+    return Action(FOLD)
+
+POLICIES: Dict[str, Policy] = {
+    'random': random_policy,
+    'station': calling_station,
+    'tag': tight_aggressive,
+}
+
+class PolicyStats:
+    def __init__(self):
+        self.hands = 0
+        self.wins = 0  # Hands finished with more chips than they started with
+        self.chips = 0  # Net chips won or lost
+
+class SimulationStats:
+    def __init__(self):
+        self.tables = 0
+        self.hands = 0
+        self.actions = 0
+        self.cpu_seconds = 0.0
+        self.elapsed = 0.0
+        self.policies: Dict[str, PolicyStats] = {}
+
+    def merge(self, other: 'SimulationStats'):
+        """Add another batch of results into this one"""
+        self.tables += other.tables
+        self.hands += other.hands
+        self.actions += other.actions
+        self.cpu_seconds += other.cpu_seconds
+        for name, stats in other.policies.items():
+            mine = self.policies.setdefault(name, PolicyStats())
+            mine.hands += stats.hands
+            mine.wins += stats.wins
+            mine.chips += stats.chips
+
+    def hands_per_second(self) -> float:
+        return self.hands / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        lines = [f"{self.tables} tables, {self.hands} hands, {self.hands_per_second():.0f} hands/s"]
+        for name, stats in sorted(self.policies.items()):
+            hands = max(stats.hands, 1)
+            lines.append(f"  {name:>10}: win rate {stats.wins / hands:.1%}, "
+                         f"{stats.chips:+d} chips, {stats.chips / hands:+.2f} chips/hand")
+        return "\n".join(lines)
+
+def _resolve(policy: Union[str, Policy]) -> Tuple[str, Policy]:
+    """Look up a policy by name, or name a policy function after itself"""
+    if isinstance(policy, str):
+        return policy, POLICIES[policy]
+    return policy.__name__, policy
+
+def run_table(seat_policies: Sequence[Union[str, Policy]], hands: int, rng: random.Random,
+              stats: SimulationStats, small_blind: int = 10, big_blind: int = 20,
+              history: Optional[HistoryWriter] = None, columns: Optional[ColumnWriter] = None):
+    """
+    Play `hands` hands at one table and add the results to `stats`, logging them
+    to `history` and recording them under their policy names in `columns`
+    """
+    policies = [_resolve(policy) for policy in seat_policies]
+    players = [Player(f"Seat {i+1}", (0, 0)) for i in range(len(policies))]
+    engine = TableEngine(players, small_blind, big_blind, auto_start=False, seed=rng.getrandbits(63))
+    totals = [stats.policies.setdefault(name, PolicyStats()) for name, _ in policies]
+    engine.dealer = rng.randrange(len(players))
+    if history:
+        HandRecorder(engine, history)
+    if columns:
+        ColumnRecorder(engine, columns, [name for name, _ in policies])
+
+    for _ in range(hands):
+        # Cash game: anyone who cannot cover the big blind buys back in
+        for player in players:
+            if player.chips < big_blind:
+                player.chips = STARTING_CHIPS
+        starting = [player.chips for player in players]
+
+        engine.start_new_hand()
+        while engine.game_phase != "showdown":
+            seat = engine.current_player
+            engine.act(policies[seat][1](engine, seat, rng))
+            stats.actions += 1
+
+        for player, before, total in zip(players, starting, totals):
+            total.hands += 1
+            total.chips += player.chips - before
+            if player.chips > before:
+                total.wins += 1
+    stats.tables += 1
+    stats.hands += hands
+
+def _run_tables(tables: List[List[Union[str, Policy]]], hands: int, seed: int,
+                history: Optional[str] = None, columns: Optional[str] = None) -> SimulationStats:
+    """Play a batch of tables in a worker process"""
+    started = time.process_time()
+    rng = random.Random(seed)
+    stats = SimulationStats()
+    writer = HistoryWriter(history) if history else None
+    store = ColumnWriter(columns) if columns else None
+    try:
+        for seat_policies in tables:
+            run_table(seat_policies, hands, rng, stats, history=writer, columns=store)
+    finally:
+        if writer:
+            writer.close()
+        if store:
+            store.close()
+    stats.cpu_seconds = time.process_time() - started
+    return stats
+
+def simulate(policies: Sequence[Union[str, Policy]], tables: int = 1000, hands: int = 1000,
+             seats: Tuple[int, int] = (4, 10), workers: Optional[int] = None,
+             seed: Optional[int] = None, history: Optional[str] = None,
+             columns: Optional[str] = None) -> Iterator[SimulationStats]:
+    """
+    Play `tables` independent tables of `hands` hands each across worker processes.
+    Each table seats between seats[0] and seats[1] bots drawn from `policies`; policies
+    may be names from POLICIES or module-level functions (they must pickle).
+    Yields the running totals every time a batch of tables finishes.
+    With `history`, each batch logs its hands to `history` suffixed with the batch number,
+    and with `columns` each batch records them to a columnar store named the same way.
+    """
+    rng = random.Random(seed)
+    layouts = [[rng.choice(policies) for _ in range(rng.randint(*seats))] for _ in range(tables)]
+    totals = SimulationStats()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(_run_tables, layouts[i:i + TABLES_PER_TASK], hands, rng.getrandbits(63),
+                                   f"{history}.{i // TABLES_PER_TASK:04d}" if history else None,
+                                   f"{columns}.{i // TABLES_PER_TASK:04d}" if columns else None)
+                   for i in range(0, tables, TABLES_PER_TASK)]
+        for future in as_completed(futures):
+            totals.merge(future.result())
+            totals.elapsed = time.perf_counter() - started
+            yield totals
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run bot self-play across many tables")
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument('--tables', type=int, default=1000)
+    parser.add_argument('--hands', type=int, default=1000, help="hands per table")
+    parser.add_argument('--min-seats', type=int, default=4)
+    parser.add_argument('--max-seats', type=int, default=10)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--history', help="log every hand to numbered files with this prefix")
+    parser.add_argument('--columns', help="record every action to numbered columnar stores with this prefix")
+    args = parser.parse_args()
+    for stats in simulate(args.policies, args.tables, args.hands, (args.min_seats, args.max_seats),
+                          args.workers, args.seed, args.history, args.columns):
+        print(stats, flush=True)
@@ -0,0 +1,161 @@
+import struct
+from typing import Iterable, Optional
+import numpy as np
+from deck import Deck
+from engine import TableEngine
+from models import Player
+
+PHASES = ["preflop", "flop", "turn", "river", "showdown", "game_over"]
+EMPTY = -1  # Marks an unused board or deck slot, or an undealt hole card
+
+# A snapshot is one int32 array with a fixed layout:
+#   table fields (TABLE_FIELDS), board (5 slots), deck size and deck (52 slots),
+#   then SEAT_FIELDS values per seat. The deck seed is a u64 split into two int32 fields,
+#   which with the hand number fixes how every later hand is dealt.
+TABLE_FIELDS = ['hand_number', 'dealer', 'current_player', 'pot', 'current_bet', 'phase',
+                'small_blind', 'big_blind', 'auto_start', 'seats', 'to_act', 'last_aggressor', 'ante',
+                'seed_low', 'seed_high']
+SEAT_FIELDS = ['chips', 'bet', 'folded', 'is_all_in', 'hole_0', 'hole_1', 'contribution']
+BOARD_OFFSET = len(TABLE_FIELDS)
+DECK_SIZE_OFFSET = BOARD_OFFSET + 5
+DECK_OFFSET = DECK_SIZE_OFFSET + 1
+SEATS_OFFSET = DECK_OFFSET + 52
+_FIELD = {name: i for i, name in enumerate(TABLE_FIELDS)}
+
+# Diffs: changed value count (u16), then the changed indices (u16 each) and their new values (i32 each)
+_COUNT = struct.Struct('<H')
+_SIZE = struct.Struct('<I')
+
+class Snapshot:
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    def __eq__(self, other):
+        return isinstance(other, Snapshot) and np.array_equal(self.values, other.values)
+
+    def __getitem__(self, field: str) -> int:
+        return int(self.values[_FIELD[field]])
+
+    @property
+    def seats(self) -> int:
+        return self['seats']
+
+    def seat(self, seat: int) -> np.ndarray:
+        """The SEAT_FIELDS values of one seat"""
+        start = SEATS_OFFSET + seat * len(SEAT_FIELDS)
+        return self.values[start:start + len(SEAT_FIELDS)]
+
+    @classmethod
+    def capture(cls, engine: TableEngine) -> 'Snapshot':
+        """Record everything needed to resume a table mid-hand"""
+        players = engine.players
+        values = np.full(SEATS_OFFSET + len(players) * len(SEAT_FIELDS), EMPTY, dtype=np.int32)
+        values[:BOARD_OFFSET] = (engine.hand_number, engine.dealer, engine.current_player, engine.pot,
+                                 engine.current_bet, PHASES.index(engine.game_phase), engine.small_blind,
+                                 engine.big_blind, engine.auto_start, len(players), engine.to_act,
+                                 engine.last_aggressor, engine.ante,
+                                 *np.array([engine.shuffler.seed], dtype='<u8').view('<i4'))
+        values[BOARD_OFFSET:BOARD_OFFSET + len(engine.board)] = engine.board
+        values[DECK_SIZE_OFFSET] = len(engine.deck)
+        values[DECK_OFFSET:DECK_OFFSET + len(engine.deck)] = engine.deck
+        contributions = engine.pots.contributions
+        seats = values[SEATS_OFFSET:].reshape(len(players), len(SEAT_FIELDS))
+        for i, player in enumerate(players):
+            hole = player.hole + [EMPTY] * (2 - len(player.hole))
+            contribution = contributions[i] if i < len(contributions) else 0
+            seats[i] = (player.chips, player.bet, player.folded, player.is_all_in, hole[0], hole[1], contribution)
+        return cls(values)
+
+    def restore(self, engine: TableEngine):
+        """Put a table back into the recorded state, seating placeholder players if it has too few"""
+        values = self.values.tolist()
+        (engine.hand_number, engine.dealer, engine.current_player, engine.pot, engine.current_bet,
+         phase, engine.small_blind, engine.big_blind, auto_start, seats, engine.to_act,
+         engine.last_aggressor, engine.ante, seed_low, seed_high) = values[:BOARD_OFFSET]
+        seed = int(np.array([seed_low, seed_high], dtype='<i4').view('<u8')[0])
+        if engine.shuffler.seed != seed:
+            engine.shuffler = Deck(seed)
+        engine.game_phase = PHASES[phase]
+        engine.auto_start = bool(auto_start)
+        engine.board = [code for code in values[BOARD_OFFSET:DECK_SIZE_OFFSET] if code != EMPTY]
+        engine.deck = values[DECK_OFFSET:DECK_OFFSET + values[DECK_SIZE_OFFSET]]
+        while len(engine.players) < seats:
+            engine.players.append(Player(f"Seat {len(engine.players) + 1}", (0, 0)))
+        del engine.players[seats:]
+        engine.pots.reset(seats)
+        for i, player in enumerate(engine.players):
+            start = SEATS_OFFSET + i * len(SEAT_FIELDS)
+            chips, bet, folded, is_all_in, first, second, contribution = values[start:start + len(SEAT_FIELDS)]
+            player.chips = chips
+            player.bet = bet
+            player.folded = bool(folded)
+            player.is_all_in = bool(is_all_in)
+            player.hole = [code for code in (first, second) if code != EMPTY]
+            engine.pots.contributions[i] = contribution
+        engine.active_count = sum(1 for p in engine.players if not p.folded)
+        engine.can_act = sum(1 for p in engine.players if not p.folded and not p.is_all_in)
+
+    def public(self) -> 'Snapshot':
+        """A copy without the deck, its seed and hole cards, safe to show spectators"""
+        values = self.values.copy()
+        values[_FIELD['seed_low']:_FIELD['seed_high'] + 1] = EMPTY
+        values[DECK_SIZE_OFFSET:SEATS_OFFSET] = EMPTY
+        seats = values[SEATS_OFFSET:].reshape(-1, len(SEAT_FIELDS))
+        seats[:, SEAT_FIELDS.index('hole_0'):SEAT_FIELDS.index('hole_1') + 1] = EMPTY
+        return Snapshot(values)
+
+    def to_bytes(self) -> bytes:
+        return _SIZE.pack(len(self.values)) + self.values.astype('<i4').tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Snapshot':
+        (size,) = _SIZE.unpack_from(data)
+        return cls(np.frombuffer(data, dtype='<i4', count=size, offset=_SIZE.size).astype(np.int32))
+
+def diff(old: Snapshot, new: Snapshot) -> bytes:
+    """Encode the values that changed between two snapshots of the same table"""
+    if len(old.values) != len(new.values):
+        raise ValueError("Snapshots have different seat counts; send a full snapshot instead")
+    changed = np.flatnonzero(old.values != new.values)
+    return (_COUNT.pack(len(changed)) + changed.astype('<u2').tobytes()
+            + new.values[changed].astype('<i4').tobytes())
+
+def apply_diff(snapshot: Snapshot, delta: bytes) -> Snapshot:
+    """The snapshot a diff produces; the original is left untouched"""
+    (count,) = _COUNT.unpack_from(delta)
+    indices = np.frombuffer(delta, dtype='<u2', count=count, offset=_COUNT.size)
+    changes = np.frombuffer(delta, dtype='<i4', count=count, offset=_COUNT.size + 2 * count)
+    values = snapshot.values.copy()
+    values[indices] = changes
+    return Snapshot(values)
+
+class SnapshotTracker:
+    def __init__(self, engine: TableEngine, public: bool = False):
+        """
+        Follow a table, producing the diff since the previous update each time it is asked.
+        Public trackers leave out the deck and hole cards, for spectators.
+        """
+        self.engine = engine
+        self.public = public
+        self.last: Optional[Snapshot] = None
+
+    def update(self) -> bytes:
+        """A full snapshot the first time or when seats change, otherwise a diff; the first byte says which"""
+        current = Snapshot.capture(self.engine)
+        if self.public:
+            current = current.public()
+        if self.last is None or len(self.last.values) != len(current.values):
+            self.last = current
+            return b'S' + current.to_bytes()
+        delta = diff(self.last, current)
+        self.last = current
+        return b'D' + delta
+
+def replay_updates(updates: Iterable[bytes], snapshot: Optional[Snapshot] = None) -> Optional[Snapshot]:
+    """Fold a stream of SnapshotTracker updates into the latest snapshot"""
+    for update in updates:
+        if update[:1] == b'S':
+            snapshot = Snapshot.from_bytes(update[1:])
+        else:
+            snapshot = apply_diff(snapshot, update[1:])
+    return snapshot
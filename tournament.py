@@ -0,0 +1,315 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from engine import TableEngine
+from models import Player
+from simulate import POLICIES, Policy, _resolve
+
+STARTING_CHIPS = 1500
+TABLE_SIZE = 9
+# Rounds (one hand at every table) played at each blind level
+HANDS_PER_LEVEL = 10
+# Tournaments handed to a worker process at a time
+TOURNAMENTS_PER_TASK = 10
+
+class BlindLevel:
+    def __init__(self, small_blind: int, big_blind: int, ante: int = 0):
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.ante = ante
+
+    def __repr__(self):
+        return f"BlindLevel({self.small_blind}/{self.big_blind}" + (f", ante {self.ante})" if self.ante else ")")
+
+DEFAULT_SCHEDULE = [
+    BlindLevel(10, 20), BlindLevel(15, 30), BlindLevel(25, 50), BlindLevel(50, 100, 10),
+    BlindLevel(75, 150, 15), BlindLevel(100, 200, 25), BlindLevel(150, 300, 25), BlindLevel(200, 400, 50),
+    BlindLevel(300, 600, 75), BlindLevel(400, 800, 100), BlindLevel(600, 1200, 150),
+    BlindLevel(800, 1600, 200), BlindLevel(1000, 2000, 300),
+]
+
+def blind_level(schedule: Sequence[BlindLevel], level: int) -> BlindLevel:
+    """The blinds of a level; past the end of the schedule the last level keeps doubling"""
+    if level < len(schedule):
+        return schedule[level]
+    last = schedule[-1]
+    factor = 2 ** (level - len(schedule) + 1)
+    return BlindLevel(last.small_blind * factor, last.big_blind * factor, last.ante * factor)
+
+def standard_payouts(entrants: int) -> List[float]:
+    """Prize pool shares by finishing place: about the top 15% are paid, at least three places"""
+    paid = min(entrants, max(3, round(entrants * 0.15)))
+    weights = [1 / (place + 1) ** 0.9 for place in range(paid)]
+    return [weight / sum(weights) for weight in weights]
+
+class ICM:
+    def __init__(self, stacks: Sequence[int], payouts: Sequence[float]):
+        """
+        Independent Chip Model: each remaining player takes the next place with
+        probability proportional to their stack. Equities are found by recursion
+        over the bitmask of players still to place, memoized per mask, and places
+        past the last payout are never expanded.
+        """
+        self.stacks = list(stacks)
+        self.payouts = list(payouts)
+        self.memo: Dict[int, List[float]] = {}
+
+    def equities(self) -> List[float]:
+        """Expected prize of every player"""
+        everyone = 0
+        for player, stack in enumerate(self.stacks):
+            if stack > 0:
+                everyone |= 1 << player
+        # Busted players take the places after everyone still holding chips
+        equities = self._expected(everyone)
+        busted = [player for player, stack in enumerate(self.stacks) if stack <= 0]
+        place = len(self.stacks) - len(busted)
+        for player in busted:
+            if place < len(self.payouts):
+                equities[player] = self.payouts[place]
+            place += 1
+        return equities
+
+    def _expected(self, mask: int) -> List[float]:
+        """Expected prize of each player in `mask` from the places still open to them"""
+        cached = self.memo.get(mask)
+        if cached is not None:
+            return list(cached)
+        result = [0.0] * len(self.stacks)
+        place = len(self.stacks) - bin(mask).count('1')
+        placed = sum(1 for stack in self.stacks if stack <= 0)
+        place -= placed
+        if mask and place < len(self.payouts):
+            players = [player for player in range(len(self.stacks)) if mask >> player & 1]
+            total = sum(self.stacks[player] for player in players)
+            for winner in players:
+                chance = self.stacks[winner] / total
+                result[winner] += chance * self.payouts[place]
+                rest = self._expected(mask & ~(1 << winner))
+                for player in players:
+                    if player != winner:
+                        result[player] += chance * rest[player]
+        self.memo[mask] = result
+        return list(result)
+
+def icm_equities(stacks: Sequence[int], payouts: Sequence[float]) -> List[float]:
+    """Expected share of the prize pool for every stack"""
+    return ICM(stacks, payouts).equities()
+
+class TournamentResult:
+    def __init__(self, places: List[Tuple[str, str, int, float]], hands: int, levels: int):
+        self.places = places  # (player name, policy name, finishing place from 1, prize) per entrant
+        self.hands = hands
+        self.levels = levels
+
+class Tournament:
+    def __init__(self, entrants: Sequence[Union[str, Policy]], rng: random.Random,
+                 schedule: Sequence[BlindLevel] = DEFAULT_SCHEDULE, hands_per_level: int = HANDS_PER_LEVEL,
+                 starting_chips: int = STARTING_CHIPS, table_size: int = TABLE_SIZE,
+                 payouts: Optional[Sequence[float]] = None, buy_in: float = 1.0):
+        """
+        A freezeout: every entrant starts with the same stack and plays until one
+        player holds all the chips. Tables are balanced after every round and
+        broken as soon as the remaining players fit on one table fewer.
+        """
+        self.rng = rng
+        self.schedule = schedule
+        self.hands_per_level = hands_per_level
+        self.table_size = table_size
+        self.payouts = list(payouts) if payouts is not None else standard_payouts(len(entrants))
+        self.prize_pool = buy_in * len(entrants)
+        self.policies: Dict[str, Tuple[str, Policy]] = {}
+        players = []
+        for i, policy in enumerate(entrants):
+            player = Player(f"Player {i + 1}", (0, 0), starting_chips)
+            self.policies[player.name] = _resolve(policy)
+            players.append(player)
+        rng.shuffle(players)
+
+        # Deal the players round the tables so table sizes differ by at most one
+        table_count = -(-len(players) // table_size)
+        level = blind_level(schedule, 0)
+        self.tables = []
+        for table in range(table_count):
+            engine = TableEngine(players[table::table_count], level.small_blind, level.big_blind,
+                                 auto_start=False, seed=rng.getrandbits(63), ante=level.ante)
+            engine.dealer = rng.randrange(len(engine.players))
+            self.tables.append(engine)
+        self.finished: List[Tuple[Player, int]] = []  # (player, place) in the order they busted
+        self.hands = 0
+        self.rounds = 0
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(engine.players) for engine in self.tables)
+
+    def play_round(self):
+        """Play one hand at every table, then seat out the busted players and rebalance"""
+        level = blind_level(self.schedule, self.rounds // self.hands_per_level)
+        busted = []
+        for engine in self.tables:
+            engine.small_blind, engine.big_blind, engine.ante = level.small_blind, level.big_blind, level.ante
+            starting = {id(player): player.chips for player in engine.players}
+            engine.start_new_hand()
+            while engine.game_phase not in ("showdown", "game_over"):
+                seat = engine.current_player
+                name = engine.players[seat].name
+                engine.act(self.policies[name][1](engine, seat, self.rng))
+            self.hands += 1
+            out = [player for player in engine.players if player.chips == 0]
+            busted += [(starting[id(player)], player) for player in out]
+            self._remove(engine, out)
+        self.rounds += 1
+
+        # Players knocked out in the same round place by the stack they started it with
+        place = self.remaining + len(busted)
+        for _, player in sorted(busted, key=lambda item: item[0]):
+            self.finished.append((player, place))
+            place -= 1
+        self._balance()
+
+    def _remove(self, engine: TableEngine, out: List[Player]):
+        """Take busted players off a table, keeping the button on the same player where possible"""
+        if not out:
+            return
+        button = engine.players[engine.dealer] if engine.dealer < len(engine.players) else None
+        engine.players[:] = [player for player in engine.players if player.chips > 0]
+        if button in engine.players:
+            engine.dealer = engine.players.index(button)
+        elif engine.players:
+            engine.dealer %= len(engine.players)
+
+    def _balance(self):
+        tables = [engine for engine in self.tables if engine.players]
+        # Break the smallest table whenever everyone fits on the others
+        while len(tables) > 1 and self.remaining <= (len(tables) - 1) * self.table_size:
+            broken = min(tables, key=lambda engine: len(engine.players))
+            tables.remove(broken)
+            for player in broken.players:
+                min(tables, key=lambda engine: len(engine.players)).players.append(player)
+            broken.players.clear()
+        # Then even the table sizes out to within one player
+        while tables:
+            largest = max(tables, key=lambda engine: len(engine.players))
+            smallest = min(tables, key=lambda engine: len(engine.players))
+            if len(largest.players) - len(smallest.players) <= 1:
+                break
+            # Move the player due the big blind next, like a floor would
+            seat = (largest.dealer + 2) % len(largest.players)
+            smallest.players.append(largest.players.pop(seat))
+            if seat < largest.dealer:
+                largest.dealer -= 1
+            largest.dealer %= len(largest.players)
+        self.tables = tables
+
+    def run(self) -> TournamentResult:
+        while self.remaining > 1:
+            self.play_round()
+        for engine in self.tables:
+            for player in engine.players:
+                self.finished.append((player, 1))
+        places = []
+        for player, place in self.finished:
+            prize = self.payouts[place - 1] * self.prize_pool if place <= len(self.payouts) else 0.0
+            places.append((player.name, self.policies[player.name][0], place, prize))
+        places.sort(key=lambda entry: entry[2])
+        return TournamentResult(places, self.hands, self.rounds // self.hands_per_level + 1)
+
+class PlacingStats:
+    def __init__(self):
+        self.entries = 0
+        self.wins = 0
+        self.paid = 0
+        self.prizes = 0.0
+        self.places = 0  # Sum of finishing places
+
+class TournamentStats:
+    def __init__(self):
+        self.tournaments = 0
+        self.hands = 0
+        self.cpu_seconds = 0.0
+        self.elapsed = 0.0
+        self.policies: Dict[str, PlacingStats] = {}
+
+    def add(self, result: TournamentResult):
+        self.tournaments += 1
+        self.hands += result.hands
+        for _, policy, place, prize in result.places:
+            stats = self.policies.setdefault(policy, PlacingStats())
+            stats.entries += 1
+            stats.wins += place == 1
+            stats.paid += prize > 0
+            stats.prizes += prize
+            stats.places += place
+
+    def merge(self, other: 'TournamentStats'):
+        """Add another batch of results into this one"""
+        self.tournaments += other.tournaments
+        self.hands += other.hands
+        self.cpu_seconds += other.cpu_seconds
+        for name, stats in other.policies.items():
+            mine = self.policies.setdefault(name, PlacingStats())
+            mine.entries += stats.entries
+            mine.wins += stats.wins
+            mine.paid += stats.paid
+            mine.prizes += stats.prizes
+            mine.places += stats.places
+
+    def __str__(self):
+        rate = self.tournaments / self.elapsed if self.elapsed else 0.0
+        lines = [f"{self.tournaments} tournaments, {self.hands} hands, {rate:.1f} tournaments/s"]
+        for name, stats in sorted(self.policies.items()):
+            entries = max(stats.entries, 1)
+            # Every entry costs one buy-in
+            lines.append(f"  {name:>10}: won {stats.wins / entries:.1%}, paid {stats.paid / entries:.1%}, "
+                         f"average place {stats.places / entries:.1f}, ROI {stats.prizes / entries - 1:+.1%}")
+        return "\n".join(lines)
+
+def _run_tournaments(fields: List[List[Union[str, Policy]]], seed: int, options: dict) -> TournamentStats:
+    """Play a batch of tournaments in a worker process"""
+    started = time.process_time()
+    rng = random.Random(seed)
+    stats = TournamentStats()
+    for entrants in fields:
+        stats.add(Tournament(entrants, rng, **options).run())
+    stats.cpu_seconds = time.process_time() - started
+    return stats
+
+def run_tournaments(policies: Sequence[Union[str, Policy]], tournaments: int = 1000, entrants: int = 45,
+                    workers: Optional[int] = None, seed: Optional[int] = None,
+                    **options) -> Iterator[TournamentStats]:
+    """
+    Play `tournaments` independent tournaments across worker processes, each with
+    `entrants` players drawn from `policies`. Extra keyword arguments go to Tournament.
+    Yields the running totals every time a batch finishes.
+    """
+    rng = random.Random(seed)
+    fields = [[rng.choice(policies) for _ in range(entrants)] for _ in range(tournaments)]
+    totals = TournamentStats()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(_run_tournaments, fields[i:i + TOURNAMENTS_PER_TASK], rng.getrandbits(63), options)
+                   for i in range(0, tournaments, TOURNAMENTS_PER_TASK)]
+        for future in as_completed(futures):
+            totals.merge(future.result())
+            totals.elapsed = time.perf_counter() - started
+            yield totals
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run bot tournaments across worker processes")
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument('--tournaments', type=int, default=1000)
+    parser.add_argument('--entrants', type=int, default=45)
+    parser.add_argument('--table-size', type=int, default=TABLE_SIZE)
+    parser.add_argument('--starting-chips', type=int, default=STARTING_CHIPS)
+    parser.add_argument('--hands-per-level', type=int, default=HANDS_PER_LEVEL)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    for stats in run_tournaments(args.policies, args.tournaments, args.entrants, args.workers, args.seed,
+                                 table_size=args.table_size, starting_chips=args.starting_chips,
+                                 hands_per_level=args.hands_per_level):
+        print(stats, flush=True)
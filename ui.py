@@ -1,6 +1,7 @@
 import pygame
-import os
 from typing import List, Tuple, Optional
+from atlas import CardAtlas
+from fonts import get_font, render_text
 from models import Card, Player
 
 class Button:
@@ -8,15 +9,15 @@ class Button:
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
-        self.font = pygame.font.Font(None, 36)
+        self.font = get_font(36)
+        # Labels never change, so render them once
+        self.label = self.font.render(self.text, True, (0, 0, 0))
+        self.label_rect = self.label.get_rect(center=self.rect.center)
         
     def draw(self, screen: pygame.Surface):
         pygame.draw.rect(screen, self.color, self.rect)
         pygame.draw.rect(screen, (0, 0, 0), self.rect, 2)
-        
-        text_surface = self.font.render(self.text, True, (0, 0, 0))
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        screen.blit(self.label, self.label_rect)
         
     def is_clicked(self, pos: Tuple[int, int]) -> bool:
         return self.rect.collidepoint(pos)
@@ -26,8 +27,7 @@ class UI:
         self.screen = screen
         self.screen_width = screen.get_width()
         self.screen_height = screen.get_height()
-        self.card_images = {}
-        self.load_card_images()
+        self.atlas = CardAtlas()
         
         # Create buttons
         button_width = 150  # Increased button width
@@ -48,53 +48,12 @@ class UI:
         self.slider_pos = 0.5  # 0 to 1
         self.slider_dragging = False
         
-    def load_card_images(self):
-        """Load card images from a cards directory"""
-        # Create cards directory if it doesn't exist
-        if not os.path.exists('cards'):
-            os.makedirs('cards')
-            # TODO: Add code to generate card images if they don't exist
-            
-        # Load card images
-        for suit in ['Hearts', 'Diamonds', 'Clubs', 'Spades']:
-            for value in ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']:
-                image_path = f'cards/{value.lower()}_{suit.lower()}.png'
-                if os.path.exists(image_path):
-                    self.card_images[f"{value}_{suit}"] = pygame.image.load(image_path)
-                else:
-                    # Create a placeholder card with suit-specific colors
-                    surf = pygame.Surface((100, 140))
-                    surf.fill((255, 255, 255))
-                    pygame.draw.rect(surf, (0, 0, 0), surf.get_rect(), 2)
-                    
-                    # Set color based on suit
-                    if suit == 'Hearts':
-                        color = (255, 0, 0)  # Red
-                    elif suit == 'Diamonds':
-                        color = (255, 165, 0)  # Orange
-                    elif suit == 'Clubs':
-                        color = (0, 0, 255)  # Blue
-                    else:  # Spades
-                        color = (0, 0, 0)  # Black
-                    
-                    # Draw the card value
-                    font = pygame.font.Font(None, 72)  # Larger font for better visibility
-                    text = font.render(value, True, color)
-                    text_rect = text.get_rect(center=surf.get_rect().center)
-                    surf.blit(text, text_rect)
-                    
-                    self.card_images[f"{value}_{suit}"] = surf
-    
     def draw_card(self, card: Card, pos: Tuple[int, int], face_up: bool = True):
         """Draw a card at the specified position"""
         if face_up and card.face_up:
-            image = self.card_images.get(f"{card.value}_{card.suit}")
-            if image:
-                self.screen.blit(image, pos)
+            self.screen.blit(self.atlas.face(card.code), pos)
         else:
-            # Draw card back
-            pygame.draw.rect(self.screen, (0, 0, 100), pygame.Rect(pos[0], pos[1], 100, 140))
-            pygame.draw.rect(self.screen, (0, 0, 0), pygame.Rect(pos[0], pos[1], 100, 140), 2)
+            self.screen.blit(self.atlas.back(), pos)
     
     def draw_blind_label(self, x: int, y: int, text: str, color: Tuple[int, int, int]):
         """Draw a label for blind positions inside a circle"""
@@ -104,12 +63,11 @@ class UI:
         pygame.draw.circle(self.screen, color, (x, y), circle_radius - 2)  # Colored border
         
         # Draw text
-        font = pygame.font.Font(None, 24)
-        text_surface = font.render(text, True, (255, 255, 255))  # White text
+        text_surface = render_text(text, 24, (255, 255, 255))  # White text
         text_rect = text_surface.get_rect(center=(x, y))
         self.screen.blit(text_surface, text_rect)
 
-    def draw_player(self, player: Player, is_current_player: bool = False, is_dealer: bool = False, is_small_blind: bool = False, is_big_blind: bool = False):
+    def draw_player(self, player: Player, is_current_player: bool = False, is_dealer: bool = False, is_small_blind: bool = False, is_big_blind: bool = False, equity: Optional[float] = None):
         """Draw a player's information and cards"""
         # Draw cards with proper spacing
         card_spacing = 120  # Reduced spacing between cards
@@ -122,11 +80,16 @@ class UI:
             self.draw_card(card, card_pos)
             
         # Draw player name and chips below cards
-        font = pygame.font.Font(None, 36)
         text_color = (255, 255, 0) if is_current_player else (255, 255, 255)
-        text = font.render(f"{player.name} - Chips: {player.chips}", True, text_color)
+        text = render_text(f"{player.name} - Chips: {player.chips}", 36, text_color)
         text_rect = text.get_rect(center=(player.position[0], player.position[1] + 150))  # Moved text further down
         self.screen.blit(text, text_rect)
+
+        # Draw all-in equity below the chip count
+        if equity is not None:
+            equity_text = render_text(f"All-in equity: {equity:.1%}", 30, (255, 255, 255))
+            equity_rect = equity_text.get_rect(center=(player.position[0], player.position[1] + 185))
+            self.screen.blit(equity_text, equity_rect)
             
         # Draw position indicators above cards
         if is_dealer:
@@ -144,8 +107,7 @@ class UI:
     
     def draw_pot(self, amount: int, x: int, y: int):
         """Draw pot amount below community cards"""
-        font = pygame.font.Font(None, 48)
-        text = font.render(f"Pot: ${amount}", True, (255, 255, 255))
+        text = render_text(f"Pot: ${amount}", 48, (255, 255, 255))
         text_rect = text.get_rect(center=(x, y))
         self.screen.blit(text, text_rect)
     
@@ -155,8 +117,9 @@ class UI:
         self.check_button.draw(self.screen)
         self.call_button.draw(self.screen)
         self.raise_button.draw(self.screen)
-        
-        # Draw betting slider
+
+    def draw_slider(self):
+        """Draw the betting slider and the bet it is set to"""
         pygame.draw.rect(self.screen, (200, 200, 200), self.slider_rect)
         pygame.draw.rect(self.screen, (0, 0, 0), self.slider_rect, 2)
         
@@ -167,11 +130,30 @@ class UI:
         pygame.draw.circle(self.screen, (0, 0, 0), slider_handle_pos, 10)
         
         # Draw current bet amount above slider
-        font = pygame.font.Font(None, 36)
         current_bet = self.get_bet_amount(0, 1000)  # Example max bet of 1000
-        bet_text = font.render(f"Bet: ${current_bet}", True, (255, 255, 255))
+        bet_text = render_text(f"Bet: ${current_bet}", 36, (255, 255, 255))
         bet_rect = bet_text.get_rect(center=(self.slider_rect.centerx, self.slider_rect.y - 20))
         self.screen.blit(bet_text, bet_rect)
+
+    # Screen areas covered by each element, used to repaint only what changed
+    def player_area(self, player: Player, width: int = 380) -> pygame.Rect:
+        """Cards, position label, name, chips and equity of a player"""
+        x, y = player.position
+        return pygame.Rect(x - width // 2, y - 136, width, 336)
+
+    def community_area(self, x: int, y: int) -> pygame.Rect:
+        """Room for all five community cards"""
+        return pygame.Rect(x - 250, y, 500, 140)
+
+    def pot_area(self, x: int, y: int) -> pygame.Rect:
+        return pygame.Rect(0, 0, 300, 50).move(x - 150, y - 25)
+
+    def buttons_area(self) -> pygame.Rect:
+        return self.fold_button.rect.unionall([self.check_button.rect, self.call_button.rect, self.raise_button.rect])
+
+    def slider_area(self) -> pygame.Rect:
+        """Slider bar, handle and the bet text above it"""
+        return self.slider_rect.inflate(24, 0).union(self.slider_rect.move(0, -40)).inflate(0, 12)
     
     def handle_click(self, pos: Tuple[int, int]) -> Optional[str]:
         """Handle mouse clicks and return the action taken"""
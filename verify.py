@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from evaluator import HAND_RANK_SHIFT, BoardEvaluator, evaluate_codes, evaluate_mask, make_strength
+from game_logic import PokerHand
+
+# Every 7-card hand is verified exactly once: a shard holds the hands whose two
+# lowest card codes are (first, second), and the other five are drawn from above
+SHARDS = [(first, second) for first in range(52) for second in range(first + 1, 47)]
+TOTAL_HANDS = 133_784_560
+CHUNK_HANDS = 1 << 17
+# Mismatches kept per shard for the report
+MAX_REPORTED = 10
+
+SUBSETS = np.array(list(combinations(range(7), 5)))
+
+def five_card_strength(codes: Sequence[int]) -> int:
+    """Classify exactly five cards directly, without any lookup tables"""
+    values = sorted((code % 13 + 2 for code in codes), reverse=True)
+    flush = len({code // 13 for code in codes}) == 1
+    high = 0
+    if len(set(values)) == 5:
+        if values[0] - values[4] == 4:
+            high = values[0]
+        elif values == [14, 5, 4, 3, 2]:
+            high = 5  # The wheel plays the ace low
+    if flush and high == 14:
+        return make_strength(9, [])
+    if flush and high:
+        return make_strength(8, [high])
+
+    # Order the values by how often they appear, then by value
+    groups = sorted(set(values), key=lambda value: (values.count(value), value), reverse=True)
+    counts = [values.count(value) for value in groups]
+    if counts[0] == 4:
+        return make_strength(7, groups)
+    if counts == [3, 2]:
+        return make_strength(6, groups)
+    if flush:
+        return make_strength(5, values)
+    if high:
+        return make_strength(4, [high])
+    if counts[0] == 3:
+        return make_strength(3, groups)
+    if counts[:2] == [2, 2]:
+        return make_strength(2, groups)
+    if counts[0] == 2:
+        return make_strength(1, groups)
+    return make_strength(0, values)
+
+def reference_strength(codes: Sequence[int]) -> int:
+    """Best five-card hand out of seven, found by trying all 21 of them"""
+    return max(five_card_strength(hand) for hand in combinations(codes, 5))
+
+def _pack(*kickers: np.ndarray) -> np.ndarray:
+    packed = np.zeros_like(kickers[0])
+    for shift, kicker in zip((16, 12, 8, 4, 0), kickers):
+        packed |= kicker << shift
+    return packed
+
+def five_card_batch(cards: np.ndarray) -> np.ndarray:
+    """five_card_strength for every row of an (N, 5) array of card codes"""
+    values = np.sort(cards % 13 + 2, axis=1)[:, ::-1]
+    suits = cards // 13
+    flush = (suits == suits[:, :1]).all(axis=1)
+    counts = (values[:, :, None] == values[:, None, :]).sum(axis=2)
+    # Sorting on count then value lines each group up ahead of the smaller ones
+    grouped = np.sort(counts * 16 + values, axis=1)[:, ::-1] & 15
+    shape = np.sort(counts, axis=1)[:, ::-1]
+    distinct = shape[:, 0] == 1
+    high = np.where(distinct & (values[:, 0] - values[:, 4] == 4), values[:, 0],
+                    np.where(distinct & (values[:, 0] == 14) & (values[:, 1] == 5), 5, 0))
+    v, g = values.T, grouped.T
+    zero = np.zeros_like(high)
+    conditions = [
+        flush & (high == 14),
+        flush & (high > 0),
+        shape[:, 0] == 4,
+        (shape[:, 0] == 3) & (shape[:, 3] == 2),
+        flush,
+        high > 0,
+        shape[:, 0] == 3,
+        (shape[:, 0] == 2) & (shape[:, 3] == 2),
+        shape[:, 0] == 2,
+    ]
+    choices = [
+        zero,
+        _pack(high),
+        _pack(g[0], g[4]),
+        _pack(g[0], g[3]),
+        _pack(*v),
+        _pack(high),
+        _pack(g[0], g[3], g[4]),
+        _pack(g[0], g[2], g[4]),
+        _pack(g[0], g[2], g[3], g[4]),
+    ]
+    ranks = np.select(conditions, [9, 8, 7, 6, 5, 4, 3, 2, 1], 0)
+    return (ranks << HAND_RANK_SHIFT) | np.select(conditions, choices, _pack(*v))
+
+def reference_batch(cards: np.ndarray) -> np.ndarray:
+    """reference_strength for every row of an (N, 7) array of card codes"""
+    cards = cards.astype(np.int64)
+    best = five_card_batch(cards[:, SUBSETS[0]])
+    for subset in SUBSETS[1:]:
+        np.maximum(best, five_card_batch(cards[:, subset]), out=best)
+    return best
+
+def _per_hand(evaluate: Callable[[List[int]], int]) -> Callable[[np.ndarray], np.ndarray]:
+    def run(cards: np.ndarray) -> np.ndarray:
+        return np.array([evaluate(codes) for codes in cards.tolist()], dtype=np.int64)
+    return run
+
+def _masks(cards: np.ndarray) -> List[int]:
+    return (np.left_shift(1, cards.astype(np.uint64)).sum(axis=1)).tolist()
+
+# A candidate takes an (N, 7) array of card codes and returns N strengths
+CANDIDATES: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'evaluate_batch': lambda cards: PokerHand.evaluate_batch(cards[:, :2], cards[:, 2:]),
+    'evaluate_codes': _per_hand(evaluate_codes),
+    'evaluate_mask': lambda cards: np.array([evaluate_mask(mask) for mask in _masks(cards)], dtype=np.int64),
+    'evaluate_strength': _per_hand(lambda codes: PokerHand.evaluate_strength(codes[:2], codes[2:])),
+    'board_evaluator': _per_hand(lambda codes: BoardEvaluator(codes[2:]).evaluate(codes[0], codes[1])),
+    # Checks the vectorized reference against the plain one; only practical with --sample
+    'reference': _per_hand(reference_strength),
+}
+
+@lru_cache(maxsize=None)
+def _five_card_hands() -> np.ndarray:
+    """All 2,598,960 five-card hands in lexicographic order"""
+    return np.array(list(combinations(range(52), 5)), dtype=np.uint8)
+
+def shard_hands(shard: int) -> int:
+    first, second = SHARDS[shard]
+    above = 51 - second
+    return above * (above - 1) * (above - 2) * (above - 3) * (above - 4) // 120
+
+def check(candidate: str, cards: np.ndarray) -> Tuple[int, List[Tuple[List[int], int, int]]]:
+    """Count the rows where a candidate disagrees with the reference, keeping a few of them"""
+    expected = reference_batch(cards)
+    actual = np.asarray(CANDIDATES[candidate](cards), dtype=np.int64)
+    wrong = np.flatnonzero(expected != actual)
+    examples = [(cards[i].tolist(), int(expected[i]), int(actual[i])) for i in wrong[:MAX_REPORTED]]
+    return len(wrong), examples
+
+def check_shard(candidate: str, shard: int, chunk: int = CHUNK_HANDS) -> Tuple[int, int, list]:
+    """Check every hand of one shard, returning (hands, mismatches, examples)"""
+    first, second = SHARDS[shard]
+    rest = _five_card_hands()
+    # Hands are sorted by their lowest card, so the ones above `second` are a suffix
+    rest = rest[np.searchsorted(rest[:, 0], second + 1):]
+    mismatches, examples = 0, []
+    for start in range(0, len(rest), chunk):
+        part = rest[start:start + chunk]
+        cards = np.empty((len(part), 7), dtype=np.int64)
+        cards[:, 0], cards[:, 1], cards[:, 2:] = first, second, part
+        wrong, found = check(candidate, cards)
+        mismatches += wrong
+        examples += found[:MAX_REPORTED - len(examples)]
+    return len(rest), mismatches, examples
+
+class Progress:
+    def __init__(self, path: Optional[str], candidate: str):
+        """Completed shards and mismatches so far, saved after every shard so a run can resume"""
+        self.path = path
+        self.candidate = candidate
+        self.done: Dict[int, Tuple[int, int]] = {}  # shard -> (hands, mismatches)
+        self.examples: list = []
+        if path and os.path.exists(path):
+            with open(path) as file:
+                saved = json.load(file)
+            if saved['candidate'] != candidate:
+                raise ValueError(f"{path} holds progress for {saved['candidate']}, not {candidate}")
+            self.done = {int(shard): tuple(result) for shard, result in saved['done'].items()}
+            self.examples = saved['examples']
+
+    @property
+    def hands(self) -> int:
+        return sum(hands for hands, _ in self.done.values())
+
+    @property
+    def mismatches(self) -> int:
+        return sum(wrong for _, wrong in self.done.values())
+
+    def record(self, shard: int, hands: int, mismatches: int, examples: list):
+        self.done[shard] = (hands, mismatches)
+        self.examples += examples[:MAX_REPORTED - len(self.examples)]
+        if self.path:
+            # Replace the file in one step so an interrupted run never leaves it half written
+            temporary = self.path + '.tmp'
+            with open(temporary, 'w') as file:
+                json.dump({'candidate': self.candidate, 'done': self.done, 'examples': self.examples}, file)
+            os.replace(temporary, self.path)
+
+def verify_exhaustive(candidate: str, workers: Optional[int] = None, progress_path: Optional[str] = None,
+                      report: Callable[[Progress], None] = lambda progress: None) -> Progress:
+    """Check all 133,784,560 seven-card hands, skipping shards an earlier run already finished"""
+    progress = Progress(progress_path, candidate)
+    remaining = [shard for shard in range(len(SHARDS)) if shard not in progress.done]
+    # Start with the largest shards so the pool doesn't end on one long straggler
+    remaining.sort(key=shard_hands, reverse=True)
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(check_shard, candidate, shard): shard for shard in remaining}
+        for future in as_completed(futures):
+            progress.record(futures[future], *future.result())
+            report(progress)
+    return progress
+
+def verify_sample(candidate: str, hands: int, seed: Optional[int] = None) -> Tuple[int, list]:
+    """Check `hands` random seven-card hands"""
+    from equity import draw_without_replacement
+    rng = np.random.default_rng(seed)
+    mismatches, examples = 0, []
+    for start in range(0, hands, CHUNK_HANDS):
+        cards = draw_without_replacement(rng, 52, 7, min(CHUNK_HANDS, hands - start))
+        wrong, found = check(candidate, cards)
+        mismatches += wrong
+        examples += found[:MAX_REPORTED - len(examples)]
+    return mismatches, examples
+
+def _print_examples(examples: list):
+    for codes, expected, actual in examples:
+        print(f"  {codes}: expected {expected:#x}, got {actual:#x}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check an evaluator against a brute-force best-5-of-7 reference")
+    parser.add_argument('--candidate', choices=sorted(CANDIDATES), default='evaluate_batch')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--progress', help="JSON file recording finished shards; an interrupted run resumes from it")
+    parser.add_argument('--sample', type=int, help="check this many random hands instead of all of them")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
+    if args.sample:
+        mismatches, examples = verify_sample(args.candidate, args.sample, args.seed)
+        print(f"{args.candidate}: {mismatches} mismatches in {args.sample:,} random hands "
+              f"({time.perf_counter() - started:.1f}s)")
+        _print_examples(examples)
+        return 1 if mismatches else 0
+
+    def report(progress: Progress):
+        hands = progress.hands
+        elapsed = time.perf_counter() - started
+        print(f"\r{hands:,}/{TOTAL_HANDS:,} hands ({hands / TOTAL_HANDS:.1%}), "
+              f"{progress.mismatches} mismatches, {elapsed:.0f}s", end='', flush=True)
+
+    progress = verify_exhaustive(args.candidate, args.workers, args.progress, report)
+    print()
+    print(f"{args.candidate}: {progress.mismatches} mismatches in {progress.hands:,} hands")
+    _print_examples(progress.examples)
+    return 1 if progress.mismatches or progress.hands != TOTAL_HANDS else 0
+
+if __name__ == '__main__':
+    sys.exit(main())